@@ -5,53 +5,377 @@
 Intelligence artificielle pour le jeu Tetris
 """
 
+import json
 import random
-import copy
 import time
-from typing import List, Tuple, Dict
-from constants import GRID_WIDTH, GRID_HEIGHT, SHAPES
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, astuple, fields
+from typing import List, Tuple, Dict, Optional
+from constants import GRID_WIDTH, GRID_HEIGHT, SHAPES, STANDARD_TETROMINOS
+from board import Board, POPCOUNT, column_range, is_well, is_deep_well
+import instrumentation
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel : l'évaluation scalaire sert de repli
+    np = None
+
+# Score attribué à une position où la pièce ne peut plus être placée
+GAME_OVER_SCORE = -10000.0
+
+# Placements examinés pour une pièce sur une grille (toutes rotations et colonnes)
+PLACEMENT_COUNTS = {
+    piece_type: sum(len(column_range(piece_type, rotation)) for rotation in range(len(rotations)))
+    for piece_type, rotations in SHAPES.items()
+}
+
+
+@dataclass(frozen=True)
+class EvaluationWeights:
+    """Poids de l'évaluation d'une position (optimisables avec tuner.py)"""
+    # Paramètres d'évaluation optimisés
+    aggregate_height: float = -0.510066
+    complete_lines: float = 0.760666
+    holes: float = -0.35663
+    bumpiness: float = -0.184483
+
+    # Nouveaux paramètres
+    wells: float = 0.3  # Favoriser les "puits" pour les pièces I
+    top_row: float = -1.0  # Pénaliser fortement les pièces trop hautes
+    deep_wells: float = 0.2  # Bonus pour les puits profonds
+    line_bonus: float = 10.0  # Bonus pour les lignes complètes, multiplié par leur nombre au carré
+
+    @classmethod
+    def names(cls) -> List[str]:
+        """Retourne le nom des poids, dans l'ordre des vecteurs"""
+        return [field.name for field in fields(cls)]
+
+    def to_vector(self) -> List[float]:
+        """Retourne les poids sous forme de liste"""
+        return list(astuple(self))
+
+    @classmethod
+    def from_vector(cls, vector: List[float]) -> 'EvaluationWeights':
+        """Construit des poids à partir d'une liste (dans l'ordre de names())"""
+        return cls(*vector)
+
+    @classmethod
+    def load(cls, path: str) -> 'EvaluationWeights':
+        """Lit des poids depuis un fichier JSON (les poids absents gardent leur valeur par défaut)"""
+        with open(path) as source:
+            return cls(**json.load(source))
+
+    def save(self, path: str) -> None:
+        """Écrit les poids dans un fichier JSON"""
+        with open(path, 'w') as output:
+            json.dump(asdict(self), output, indent=2)
+
 
 class TetrisAI:
     """Classe d'intelligence artificielle pour Tetris"""
     
-    # Mémoriser la décision pour éviter les changements de dernière minute
-    last_decision = None
-    decision_piece = None
+    # Évaluer tous les placements en un seul lot lorsque NumPy est disponible
+    use_numpy = np is not None
     
-    @staticmethod
-    def get_best_move(grid: List[List[str]], piece_type: str, current_rotation: int) -> Tuple[int, int, int]:
+    def __init__(self, depth: int = 2, beam_width: int = 5, expectation: bool = False, time_budget: float = 0.5,
+                 cache_size: int = 1024, max_depth: int = 3, weights: Optional[EvaluationWeights] = None):
+        """
+        Configure la recherche :
+        - depth : nombre de pièces anticipées (1 = pièce actuelle seulement, 2 = avec la suivante)
+        - beam_width : nombre de meilleurs placements développés à chaque niveau
+        - expectation : compléter les niveaux sans pièce connue par une moyenne sur les 7 pièces standard
+        - time_budget : durée maximale d'une décision en secondes
+        - cache_size : nombre de décisions mémorisées (les moins récemment utilisées sont oubliées)
+        - max_depth : profondeur maximale de la recherche itérative (get_anytime_move)
+        - weights : poids de l'évaluation (par défaut EvaluationWeights(), voir EvaluationWeights.load)
+        """
+        self.depth = depth
+        self.max_depth = max_depth
+        self.beam_width = beam_width
+        self.expectation = expectation
+        self.time_budget = time_budget
+        self.weights = weights if weights is not None else EvaluationWeights()
+        
+        # Table de transposition : (grille, pièces restantes) -> valeur
+        self.transpositions: Dict[tuple, float] = {}
+        self.timed_out = False  # La dernière recherche a-t-elle été interrompue par l'échéance ?
+        self.completed_depth = 0  # Profondeur de la dernière itération complète (get_anytime_move)
+        
+        # Décisions déjà prises : (grille, pièce, rotation, pièce suivante) -> (rotation, colonne, score)
+        self.cache_size = cache_size
+        self.decisions: 'OrderedDict[tuple, Tuple[int, int, float]]' = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        
+        # Statistiques de la dernière décision
+        self.think_time = 0.0  # Durée en secondes
+        self.candidates = 0  # Placements examinés (0 si la décision venait du cache)
+    
+    def get_best_move(self, grid: Board, piece_type: str, current_rotation: int,
+                      next_piece: Optional[str] = None, time_budget: Optional[float] = None) -> Tuple[int, int, float]:
         """
         Détermine le meilleur mouvement pour la pièce actuelle
         Retourne (rotation, colonne, score)
         """
-        # Si c'est la même pièce et que nous avons déjà pris une décision, la maintenir
-        if TetrisAI.decision_piece == piece_type and TetrisAI.last_decision is not None:
-            return TetrisAI.last_decision
+        start = time.perf_counter()
+        self.candidates = 0
+        decision = self._best_move(grid, piece_type, current_rotation, next_piece, time_budget)
+        self._record_decision(start)
+        return decision
+    
+    def get_anytime_move(self, grid: Board, piece_type: str, current_rotation: int,
+                         next_piece: Optional[str] = None, time_budget: Optional[float] = None,
+                         queue: Tuple[str, ...] = ()) -> Tuple[int, int, float]:
+        """
+        Recherche interruptible par approfondissement itératif : la pièce actuelle seule,
+        puis avec la pièce suivante et les pièces connues de la file (queue), puis en
+        moyenne sur des pièces inconnues, jusqu'à max_depth pièces ou jusqu'à l'échéance
+        (time_budget secondes).
+        Retourne (rotation, colonne, score) de la dernière itération terminée.
+        """
+        start = time.perf_counter()
+        self.candidates = 0
+        decision = self._anytime_move(grid, piece_type, current_rotation, next_piece, time_budget, queue)
+        self._record_decision(start)
+        return decision
+    
+    def _record_decision(self, start: float) -> None:
+        """Mémorise la durée de la décision et l'ajoute aux mesures si elles sont actives"""
+        self.think_time = time.perf_counter() - start
+        if instrumentation.enabled:
+            instrumentation.AI_DECISION.record(self.think_time)
+            instrumentation.AI_CANDIDATES.record(self.candidates)
+    
+    def _best_move(self, grid: Board, piece_type: str, current_rotation: int,
+                   next_piece: Optional[str], time_budget: Optional[float]) -> Tuple[int, int, float]:
+        """Décision de get_best_move"""
+        self.timed_out = False
+        
+        # Réutiliser la décision prise pour exactement la même position : la grille entière
+        # sert de clé (une collision de hachage rejouerait le coup d'une autre grille), et la
+        # pièce suivante n'en fait partie que si la recherche la regarde
+        key = (tuple(grid.rows), piece_type, current_rotation, next_piece if self.depth >= 2 else None)
+        decision = self.decisions.get(key)
+        if decision is not None:
+            self.decisions.move_to_end(key)
+            self.cache_hits += 1
+            return decision
+        self.cache_misses += 1
+        
+        # Pièces à anticiper : la suivante si elle est connue, puis des pièces aléatoires
+        pieces = [piece_type]
+        if self.depth >= 2 and next_piece:
+            pieces.append(next_piece)
+        while self.expectation and len(pieces) < self.depth:
+            pieces.append(None)
+        
+        if len(pieces) > 1:
+            budget = self.time_budget if time_budget is None else time_budget
+            deadline = time.perf_counter() + budget
+            self.transpositions.clear()
+            best_rotation, best_column, best_score = self._search_lookahead(
+                grid, tuple(pieces), current_rotation, deadline
+            )
+        else:
+            best_rotation, best_column, best_score = self._search_ply(grid, piece_type, current_rotation)
+            self.candidates += PLACEMENT_COUNTS[piece_type]
+        
+        # Mémoriser la décision pour cette position, sauf si la recherche a été interrompue
+        if not self.timed_out:
+            self._remember(key, (best_rotation, best_column, best_score))
+        return best_rotation, best_column, best_score
+    
+    def _anytime_move(self, grid: Board, piece_type: str, current_rotation: int,
+                      next_piece: Optional[str], time_budget: Optional[float],
+                      queue: Tuple[str, ...]) -> Tuple[int, int, float]:
+        """Décision de get_anytime_move"""
+        # Seules les pièces de la file que la recherche peut atteindre comptent
+        queue = tuple(queue[:max(self.max_depth - 2, 0)])
+        key = (tuple(grid.rows), piece_type, current_rotation, next_piece if self.max_depth >= 2 else None,
+               queue, self.max_depth)
+        decision = self.decisions.get(key)
+        if decision is not None:
+            self.decisions.move_to_end(key)
+            self.cache_hits += 1
+            self.completed_depth = self.max_depth
+            return decision
+        self.cache_misses += 1
+        
+        budget = self.time_budget if time_budget is None else time_budget
+        deadline = time.perf_counter() + budget
+        
+        # Premier niveau : toujours terminé, il garantit un coup même sans budget
+        best = self._search_ply(grid, piece_type, current_rotation)
+        self.candidates += PLACEMENT_COUNTS[piece_type]
+        self.completed_depth = 1
+        
+        # Les niveaux suivants réutilisent la table de transposition des précédents
+        self.transpositions.clear()
+        known = [next_piece, *queue] if next_piece else []
+        pieces = [piece_type]
+        last_duration = 0.0
+        while len(pieces) < self.max_depth:
+            pieces.append(known[len(pieces) - 1] if len(pieces) <= len(known) else None)
+            
+            # Chaque itération coûte plus que la précédente : ne pas en commencer
+            # une qui n'a aucune chance de se terminer
+            started = time.perf_counter()
+            if deadline - started <= last_duration:
+                break
+            
+            self.timed_out = False
+            result = self._search_lookahead(grid, tuple(pieces), current_rotation, deadline)
+            if self.timed_out:
+                break
+            best = result
+            self.completed_depth = len(pieces)
+            last_duration = time.perf_counter() - started
+        
+        # Seule une recherche menée jusqu'au bout ne dépend pas du budget accordé
+        if self.completed_depth == self.max_depth:
+            self._remember(key, best)
+        return best
+    
+    def _remember(self, key: tuple, decision: Tuple[int, int, float]) -> None:
+        """Mémorise une décision en oubliant la moins récemment utilisée si le cache est plein"""
+        self.decisions[key] = decision
+        if len(self.decisions) > self.cache_size:
+            self.decisions.popitem(last=False)
+    
+    def clear_cache(self) -> None:
+        """Oublie les décisions mémorisées et remet les compteurs à zéro"""
+        self.decisions.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def _search_lookahead(self, grid: Board, pieces: Tuple[Optional[str], ...], current_rotation: int,
+                          deadline: float) -> Tuple[int, int, float]:
+        """
+        Recherche sur plusieurs pièces : seuls les beam_width meilleurs placements
+        de chaque niveau sont développés, et les grilles déjà évaluées sont réutilisées.
+        Un placement dont l'exploration est interrompue par l'échéance est écarté : sa
+        valeur partielle n'est pas comparable à celle des placements explorés jusqu'au bout.
+        Si aucun ne l'est, retourne le meilleur placement de la pièce seule.
+        """
+        board = grid.copy(with_colors=False)
+        initial_state = board.save()
+        
+        placements = self._list_placements(board, pieces[0])
+        self.candidates += PLACEMENT_COUNTS[pieces[0]]
+        if not placements:
+            return current_rotation, 0, float('-inf')
+        
+        # Développer les premiers placements du meilleur au moins bon
+        placements.sort(key=lambda placement: placement[0], reverse=True)
+        best_score, best_rotation, best_column, _, _ = placements[0]
+        best_value = float('-inf')
+        for score, rotation, col, row, lines_cleared in placements[:self.beam_width]:
+            # Budget épuisé : garder le meilleur résultat trouvé jusqu'ici
+            if time.perf_counter() > deadline:
+                self.timed_out = True
+                break
+            
+            board.restore(initial_state)
+            board.place(pieces[0], rotation, row, col)
+            board.clear_lines()
+            value = self._line_reward(lines_cleared) + self._value(board, pieces[1:], deadline)
+            if self.timed_out:
+                break
+            if value > best_value:
+                best_value = value
+                best_rotation = rotation
+                best_column = col
+        
+        if best_value == float('-inf'):
+            return best_rotation, best_column, best_score
+        return best_rotation, best_column, best_value
+    
+    def _value(self, board: Board, pieces: Tuple[Optional[str], ...], deadline: float) -> float:
+        """Valeur d'une grille pour la suite de pièces donnée (None = pièce inconnue)"""
+        if not pieces:
+            return self._evaluate_position(board, 0)
+        
+        key = (board.zobrist, pieces)
+        value = self.transpositions.get(key)
+        if value is not None:
+            return value
+        
+        # Budget épuisé : se contenter de l'évaluation statique de la grille
+        if time.perf_counter() > deadline:
+            self.timed_out = True
+            return self._evaluate_position(board, 0)
         
+        if pieces[0] is None:
+            # Pièce inconnue : moyenne sur les pièces standard
+            value = sum(
+                self._value(board, (piece_type,) + pieces[1:], deadline)
+                for piece_type in STANDARD_TETROMINOS
+            ) / len(STANDARD_TETROMINOS)
+        else:
+            placements = self._list_placements(board, pieces[0])
+            self.candidates += PLACEMENT_COUNTS[pieces[0]]
+            if not placements:
+                value = GAME_OVER_SCORE
+            elif len(pieces) == 1:
+                # Dernier niveau : meilleur score immédiat
+                value = max(placement[0] for placement in placements)
+            else:
+                placements.sort(key=lambda placement: placement[0], reverse=True)
+                state = board.save()
+                value = float('-inf')
+                for _, rotation, col, row, lines_cleared in placements[:self.beam_width]:
+                    if value > float('-inf') and time.perf_counter() > deadline:
+                        self.timed_out = True
+                        break
+                    board.restore(state)
+                    board.place(pieces[0], rotation, row, col)
+                    board.clear_lines()
+                    value = max(value, self._line_reward(lines_cleared) + self._value(board, pieces[1:], deadline))
+                board.restore(state)
+        
+        self.transpositions[key] = value
+        return value
+    
+    def _search_ply(self, grid: Board, piece_type: str, current_rotation: int) -> Tuple[int, int, float]:
+        """Meilleur placement de la pièce seule, en lot avec NumPy si possible"""
+        if self.use_numpy:
+            return self._search_batch(grid, piece_type, current_rotation)
+        return self._search_scalar(grid, piece_type, current_rotation)
+    
+    def _list_placements(self, board: Board, piece_type: str) -> List[Tuple[float, int, int, int, int]]:
+        """Liste les placements (score, rotation, colonne, ligne, lignes effacées) d'une pièce"""
+        placements = []
+        state = board.save()
+        for rotation in range(len(SHAPES[piece_type])):
+            for col in column_range(piece_type, rotation):
+                row = board.landing_row(piece_type, rotation, col)
+                if row < 2:
+                    continue
+                board.place(piece_type, rotation, row, col)
+                lines_cleared = board.clear_lines()
+                placements.append((self._evaluate_position(board, lines_cleared), rotation, col, row, lines_cleared))
+                board.restore(state)
+        return placements
+    
+    def _search_scalar(self, grid: Board, piece_type: str, current_rotation: int) -> Tuple[int, int, float]:
+        """Évalue les placements un par un sur une copie de simulation"""
         best_score = float('-inf')
         best_rotation = current_rotation
         best_column = 0
         
+        # Copie de simulation unique, restaurée après chaque essai
+        test_grid = grid.copy(with_colors=False)
+        initial_state = test_grid.save()
+        
         # Essayer toutes les rotations possibles
         for rotation in range(len(SHAPES[piece_type])):
-            shape = SHAPES[piece_type][rotation]
-            
-            # Calculer la largeur et la hauteur de la pièce
-            min_col = min(col for _, col in shape)
-            max_col = max(col for _, col in shape)
-            min_row = min(row for row, _ in shape)
-            max_row = max(row for row, _ in shape)
-            piece_width = max_col - min_col + 1
-            
-            # Essayer toutes les positions horizontales possibles
-            for col in range(-min_col, GRID_WIDTH - max_col):
-                # Créer une copie de la grille pour simulation
-                test_grid = copy.deepcopy(grid)
+            # Essayer toutes les positions horizontales possibles (bornes précalculées)
+            for col in column_range(piece_type, rotation):
+                # Revenir à la grille de départ
+                test_grid.restore(initial_state)
                 
-                # Simuler la chute de la pièce
-                row = 0
-                while TetrisAI._is_valid_position(test_grid, piece_type, rotation, row + 1, col):
-                    row += 1
+                # Calculer directement la ligne d'arrivée à partir des hauteurs de colonnes
+                row = test_grid.landing_row(piece_type, rotation, col)
                 
                 # Si la pièce est placée trop haut, c'est un mauvais mouvement
                 if row < 2:
@@ -64,7 +388,7 @@ class TetrisAI:
                 lines_cleared = TetrisAI._clear_lines(test_grid)
                 
                 # Évaluer la position
-                score = TetrisAI._evaluate_position(test_grid, lines_cleared)
+                score = self._evaluate_position(test_grid, lines_cleared)
                 
                 # Mettre à jour le meilleur mouvement si nécessaire
                 if score > best_score:
@@ -72,152 +396,145 @@ class TetrisAI:
                     best_rotation = rotation
                     best_column = col
         
-        # Mémoriser la décision pour cette pièce
-        TetrisAI.last_decision = (best_rotation, best_column, best_score)
-        TetrisAI.decision_piece = piece_type
-        
         return best_rotation, best_column, best_score
     
-    @staticmethod
-    def _is_valid_position(grid: List[List[str]], piece_type: str, rotation: int, row: int, col: int) -> bool:
-        """Vérifie si la position est valide pour une pièce"""
-        shape = SHAPES[piece_type][rotation]
+    def _search_batch(self, grid: Board, piece_type: str, current_rotation: int) -> Tuple[int, int, float]:
+        """
+        Construit toutes les grilles résultantes en une pile NumPy (placement, ligne, colonne)
+        et les évalue en une seule série d'opérations vectorisées
+        """
+        # Lister les placements dans le même ordre que la recherche scalaire
+        candidates = []
+        for rotation in range(len(SHAPES[piece_type])):
+            for col in column_range(piece_type, rotation):
+                row = grid.landing_row(piece_type, rotation, col)
+                if row >= 2:
+                    candidates.append((rotation, col, row))
         
-        for block_row, block_col in shape:
-            grid_row = row + block_row
-            grid_col = col + block_col
-            
-            # Vérifier si le bloc est en dehors de la grille
-            if grid_row < 0 or grid_row >= GRID_HEIGHT or grid_col < 0 or grid_col >= GRID_WIDTH:
-                return False
-            
-            # Vérifier si le bloc entre en collision avec une cellule occupée
-            if grid_row >= 0 and grid[grid_row][grid_col]:
-                return False
+        if not candidates:
+            return current_rotation, 0, float('-inf')
+        
+        # Empiler la grille de départ et y poser chaque pièce
+        base = (np.array(grid.rows)[:, None] >> np.arange(GRID_WIDTH)) & 1
+        boards = np.repeat(base.astype(bool)[None], len(candidates), axis=0)
+        board_index, row_index, col_index = [], [], []
+        for index, (rotation, col, row) in enumerate(candidates):
+            for block_row, block_col in SHAPES[piece_type][rotation]:
+                board_index.append(index)
+                row_index.append(row + block_row)
+                col_index.append(col + block_col)
+        boards[board_index, row_index, col_index] = True
+        
+        # Effacer les lignes complètes : tri stable qui remonte les lignes pleines, puis vidage
+        full = boards.all(axis=2)
+        lines_cleared = full.sum(axis=1)
+        if lines_cleared.any():
+            order = np.argsort(~full, axis=1, kind='stable')
+            boards = np.take_along_axis(boards, order[:, :, None], axis=1)
+            boards[np.arange(GRID_HEIGHT)[None, :] < lines_cleared[:, None]] = False
+        
+        # Calculer les métriques de toutes les grilles à la fois
+        covered = np.logical_or.accumulate(boards, axis=1)
+        heights = covered.sum(axis=1)
+        holes = (covered & ~boards).sum(axis=(1, 2))
+        bumpiness = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+        
+        # Puits : mêmes règles que board.is_well / board.is_deep_well
+        neighbour_floor = np.empty_like(heights)
+        neighbour_floor[:, 0] = heights[:, 1]
+        neighbour_floor[:, -1] = heights[:, -2]
+        neighbour_floor[:, 1:-1] = np.minimum(heights[:, :-2], heights[:, 2:])
+        wells = (heights < neighbour_floor - 1).sum(axis=1)
+        deep_wells = (heights + 3 <= neighbour_floor).sum(axis=1)
+        top_row_blocks = boards[:, :4].sum(axis=(1, 2))
+        
+        scores = self._score_features(
+            heights.sum(axis=1), lines_cleared, holes, bumpiness, wells, top_row_blocks, deep_wells
+        )
         
-        return True
+        # argmax retient le premier maximum, comme la comparaison stricte de la recherche scalaire
+        best = int(np.argmax(scores))
+        rotation, col, _ = candidates[best]
+        return rotation, col, float(scores[best])
     
     @staticmethod
-    def _place_piece(grid: List[List[str]], piece_type: str, rotation: int, row: int, col: int) -> None:
+    def _is_valid_position(grid: Board, piece_type: str, rotation: int, row: int, col: int) -> bool:
+        """Vérifie si la position est valide pour une pièce"""
+        return grid.is_valid_position(piece_type, rotation, row, col)
+    
+    @staticmethod
+    def _place_piece(grid: Board, piece_type: str, rotation: int, row: int, col: int) -> None:
         """Place une pièce dans la grille"""
-        shape = SHAPES[piece_type][rotation]
-        
-        for block_row, block_col in shape:
-            grid_row = row + block_row
-            grid_col = col + block_col
-            
-            if 0 <= grid_row < GRID_HEIGHT and 0 <= grid_col < GRID_WIDTH:
-                grid[grid_row][grid_col] = piece_type
+        grid.place(piece_type, rotation, row, col)
     
     @staticmethod
-    def _clear_lines(grid: List[List[str]]) -> int:
+    def _clear_lines(grid: Board) -> int:
         """Efface les lignes complètes et retourne le nombre de lignes effacées"""
-        lines_cleared = 0
-        new_grid = copy.deepcopy(grid)
-        
-        # Vérifier chaque ligne de bas en haut
-        for row in range(GRID_HEIGHT - 1, -1, -1):
-            # Vérifier si la ligne est complète
-            if all(cell for cell in new_grid[row]):
-                lines_cleared += 1
-                
-                # Déplacer toutes les lignes au-dessus vers le bas
-                for r in range(row, 0, -1):
-                    new_grid[r] = new_grid[r - 1].copy()
-                
-                # Créer une nouvelle ligne vide en haut
-                new_grid[0] = ['' for _ in range(GRID_WIDTH)]
-        
-        # Mettre à jour la grille originale
-        for row in range(GRID_HEIGHT):
-            grid[row] = new_grid[row].copy()
-        
-        return lines_cleared
+        return grid.clear_lines()
     
-    @staticmethod
-    def _evaluate_position(grid: List[List[str]], lines_cleared: int) -> float:
+    def _evaluate_position(self, grid: Board, lines_cleared: int) -> float:
         """Évalue une position de jeu"""
-        # Paramètres d'évaluation optimisés
-        aggregate_height_weight = -0.510066
-        complete_lines_weight = 0.760666
-        holes_weight = -0.35663
-        bumpiness_weight = -0.184483
-        
-        # Nouveaux paramètres
-        well_weight = 0.3  # Favoriser les "puits" pour les pièces I
-        top_row_penalty = -1.0  # Pénaliser fortement les pièces trop hautes
-        deep_well_bonus = 0.2  # Bonus pour les puits profonds
-        
-        # Calculer les métriques
-        heights = TetrisAI._get_heights(grid)
-        aggregate_height = sum(heights)
-        holes = TetrisAI._get_holes(grid, heights)
-        bumpiness = TetrisAI._get_bumpiness(heights)
-        wells = TetrisAI._get_wells(heights)
-        top_row_blocks = TetrisAI._get_top_row_blocks(grid)
-        deep_wells = TetrisAI._get_deep_wells(heights)
+        # Lire les métriques tenues à jour par la grille
+        features = grid.features
+        return self._score_features(
+            features.aggregate_height,
+            lines_cleared,
+            features.holes,
+            features.bumpiness,
+            features.wells,
+            TetrisAI._get_top_row_blocks(grid),
+            features.deep_wells
+        )
+    
+    def _line_reward(self, lines_cleared: int) -> float:
+        """Part du score due aux lignes effacées"""
+        return self._score_features(0, lines_cleared, 0, 0, 0, 0, 0)
+    
+    def _score_features(self, aggregate_height, lines_cleared, holes, bumpiness, wells, top_row_blocks, deep_wells):
+        """Combine les métriques en score (valeurs scalaires ou tableaux NumPy)"""
+        weights = self.weights
         
         # Calculer le score
         score = (
-            aggregate_height_weight * aggregate_height +
-            complete_lines_weight * lines_cleared +
-            holes_weight * holes +
-            bumpiness_weight * bumpiness +
-            well_weight * wells +
-            top_row_penalty * top_row_blocks +
-            deep_well_bonus * deep_wells
+            weights.aggregate_height * aggregate_height +
+            weights.complete_lines * lines_cleared +
+            weights.holes * holes +
+            weights.bumpiness * bumpiness +
+            weights.wells * wells +
+            weights.top_row * top_row_blocks +
+            weights.deep_wells * deep_wells
         )
         
-        # Bonus pour les lignes complètes
-        if lines_cleared > 0:
-            score += lines_cleared * lines_cleared * 10
-        
-        return score
+        # Bonus pour les lignes complètes (nul si aucune ligne n'est effacée)
+        return score + lines_cleared * lines_cleared * weights.line_bonus
     
     @staticmethod
-    def _get_heights(grid: List[List[str]]) -> List[int]:
+    def _get_heights(grid: Board) -> List[int]:
         """Calcule la hauteur de chaque colonne"""
         heights = [0] * GRID_WIDTH
+        seen = 0
         
-        for col in range(GRID_WIDTH):
-            for row in range(GRID_HEIGHT):
-                if grid[row][col]:
-                    heights[col] = GRID_HEIGHT - row
-                    break
+        # Parcourir les lignes de haut en bas : le premier bloc rencontré fixe la hauteur
+        for row, mask in enumerate(grid.rows):
+            new_blocks = mask & ~seen
+            if new_blocks:
+                for col in range(GRID_WIDTH):
+                    if new_blocks >> col & 1:
+                        heights[col] = GRID_HEIGHT - row
+                seen |= mask
         
         return heights
     
     @staticmethod
-    def _get_holes(grid: List[List[str]], heights: List[int]) -> int:
+    def _get_holes(grid: Board, heights: List[int]) -> int:
         """Compte le nombre de trous dans la grille"""
         holes = 0
+        covered = 0
         
-        for col in range(GRID_WIDTH):
-            if heights[col] == 0:
-                continue
-            
-            # Trouver la première cellule occupée
-            top_block_row = None
-            for row in range(GRID_HEIGHT):
-                if grid[row][col]:
-                    top_block_row = row
-                    break
-            
-            if top_block_row is None:
-                continue
-            
-            # Compter les trous en dessous
-            for row in range(top_block_row + 1, GRID_HEIGHT):
-                if not grid[row][col] and row < GRID_HEIGHT:
-                    # Vérifier s'il y a un bloc au-dessus
-                    has_block_above = False
-                    for r in range(row - 1, -1, -1):
-                        if grid[r][col]:
-                            has_block_above = True
-                            break
-                    
-                    if has_block_above:
-                        holes += 1
+        # Une cellule vide est un trou si un bloc de sa colonne se trouve au-dessus
+        for mask in grid.rows:
+            holes += POPCOUNT[covered & ~mask]
+            covered |= mask
         
         return holes
     
@@ -234,47 +551,19 @@ class TetrisAI:
     @staticmethod
     def _get_wells(heights: List[int]) -> int:
         """Calcule le nombre de puits (colonnes entourées de colonnes plus hautes)"""
-        wells = 0
-        
-        # Vérifier les colonnes intérieures
-        for i in range(1, GRID_WIDTH - 1):
-            if heights[i] < heights[i-1] - 1 and heights[i] < heights[i+1] - 1:
-                wells += 1
-        
-        # Vérifier les colonnes aux bords
-        if heights[0] < heights[1] - 1:
-            wells += 1
-        if heights[GRID_WIDTH-1] < heights[GRID_WIDTH-2] - 1:
-            wells += 1
-        
-        return wells
+        return sum(1 for col in range(GRID_WIDTH) if is_well(heights, col))
     
     @staticmethod
     def _get_deep_wells(heights: List[int]) -> int:
         """Calcule le nombre de puits profonds (au moins 3 blocs de profondeur)"""
-        deep_wells = 0
-        
-        # Vérifier les colonnes intérieures
-        for i in range(1, GRID_WIDTH - 1):
-            if heights[i] + 3 <= min(heights[i-1], heights[i+1]):
-                deep_wells += 1
-        
-        # Vérifier les colonnes aux bords
-        if heights[0] + 3 <= heights[1]:
-            deep_wells += 1
-        if heights[GRID_WIDTH-1] + 3 <= heights[GRID_WIDTH-2]:
-            deep_wells += 1
-        
-        return deep_wells
+        return sum(1 for col in range(GRID_WIDTH) if is_deep_well(heights, col))
     
     @staticmethod
-    def _get_top_row_blocks(grid: List[List[str]]) -> int:
+    def _get_top_row_blocks(grid: Board) -> int:
         """Compte le nombre de blocs dans les 4 premières lignes"""
         top_blocks = 0
         
         for row in range(4):
-            for col in range(GRID_WIDTH):
-                if grid[row][col]:
-                    top_blocks += 1
+            top_blocks += POPCOUNT[grid.rows[row]]
         
         return top_blocks
\ No newline at end of file
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Réflexion de l'IA hors de la boucle principale : un thread ou un processus reçoit
+des instantanés immuables du jeu et renvoie des commandes que la boucle applique au moteur
+"""
+
+import queue
+import struct
+import threading
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from constants import GRID_HEIGHT, PIECE_NAMES, PIECE_CODES, NO_PIECE, Action
+from board import Board
+from models import Player
+from engine import Engine
+from ai import TetrisAI
+import instrumentation
+
+# En-tête d'un instantané compact : pièce, type, rotation, pièce suivante, budget
+SNAPSHOT_HEADER = struct.Struct('<IBBBd')
+
+
+@dataclass(frozen=True)
+class AISnapshot:
+    """Instantané immuable de la situation d'un joueur, envoyé à l'IA"""
+    piece_id: int  # Identifiant de la pièce, pour écarter les réponses périmées
+    rows: Tuple[int, ...]  # Masques de lignes de la grille
+    piece: str
+    rotation: int
+    next_piece: Optional[str]
+    time_budget: float  # Temps de réflexion maximum en secondes (au-delà, le meilleur coup trouvé)
+    queue: Tuple[str, ...] = ()  # Pièces standard connues après la suivante
+
+    @classmethod
+    def from_player(cls, player: Player, time_budget: float, queue_length: int = 0) -> 'AISnapshot':
+        """Capture la situation actuelle d'un joueur et les queue_length pièces de sa file"""
+        queue = tuple(player.piece_queue.peek(queue_length)) if player.piece_queue else ()
+        return cls(
+            piece_id=player.piece_id,
+            rows=tuple(player.grid.rows),
+            piece=player.current_piece,
+            rotation=player.current_rotation,
+            next_piece=player.next_piece,
+            time_budget=time_budget,
+            queue=queue
+        )
+
+    def pack(self) -> bytes:
+        """Encode l'instantané en quelques dizaines d'octets (une ligne = 16 bits, une pièce = 1 octet)"""
+        header = SNAPSHOT_HEADER.pack(
+            self.piece_id, PIECE_CODES[self.piece], self.rotation,
+            PIECE_CODES[self.next_piece] if self.next_piece else NO_PIECE, self.time_budget
+        )
+        return header + array('H', self.rows).tobytes() + bytes(PIECE_CODES[piece] for piece in self.queue)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> 'AISnapshot':
+        """Décode un instantané produit par pack"""
+        piece_id, piece, rotation, next_piece, time_budget = SNAPSHOT_HEADER.unpack_from(data)
+        rows_end = SNAPSHOT_HEADER.size + GRID_HEIGHT * 2
+        rows = array('H')
+        rows.frombytes(data[SNAPSHOT_HEADER.size:rows_end])
+        return cls(
+            piece_id=piece_id,
+            rows=tuple(rows),
+            piece=PIECE_NAMES[piece],
+            rotation=rotation,
+            next_piece=PIECE_NAMES[next_piece] if next_piece != NO_PIECE else None,
+            time_budget=time_budget,
+            queue=tuple(PIECE_NAMES[code] for code in data[rows_end:])
+        )
+
+
+@dataclass(frozen=True)
+class AICommand:
+    """Coup choisi par l'IA pour une pièce donnée"""
+    piece_id: int
+    rotation: int
+    column: int
+    think_time: float = 0.0  # Durée de la réflexion en secondes
+    candidates: int = 0  # Placements examinés
+
+
+def plan_move(ai, snapshot: AISnapshot) -> AICommand:
+    """Calcule le coup d'une IA (TetrisAI) pour un instantané, dans le budget de temps donné"""
+    rotation, column, _ = ai.get_anytime_move(
+        Board.from_rows(snapshot.rows),
+        snapshot.piece,
+        snapshot.rotation,
+        next_piece=snapshot.next_piece,
+        time_budget=snapshot.time_budget,
+        queue=snapshot.queue
+    )
+    return AICommand(
+        piece_id=snapshot.piece_id, rotation=rotation, column=column,
+        think_time=ai.think_time, candidates=ai.candidates
+    )
+
+
+class AIPilot:
+    """
+    Joue les coups de l'IA pour un joueur, une étape à la fois (rotation, déplacement
+    puis descente) au rythme d'un joueur humain. Partagé par TetrisGame et les parties
+    hébergées (host.py), qui se chargent de demander les coups et de les recevoir
+    """
+
+    def __init__(self, player_index: int, move_delay: float = 0.1, fall_delay: float = 0.05):
+        """Pilote le joueur player_index (0 ou 1) du moteur"""
+        self.player_index = player_index
+        self.move_delay = move_delay  # Délai entre deux rotations ou déplacements, en secondes
+        self.fall_delay = fall_delay  # Délai entre deux descentes, en secondes
+        self.command: Optional[AICommand] = None  # Coup en cours d'exécution
+        self.requested_piece = 0  # Dernière pièce envoyée à l'IA
+        self.next_step = 0.0  # Instant de la prochaine étape du coup
+        self.waiting = False  # Un coup a été demandé et n'est pas encore arrivé
+
+    def needs_move(self, engine: Engine) -> bool:
+        """Indique si la pièce actuelle attend encore sa demande de coup"""
+        player = engine.players[self.player_index]
+        return (engine.can_move(player) and self.command is None
+                and player.piece_id != self.requested_piece)
+
+    def request(self, engine: Engine) -> Player:
+        """Note la demande de coup pour la pièce actuelle et retourne le joueur à capturer"""
+        player = engine.players[self.player_index]
+        self.requested_piece = player.piece_id
+        self.waiting = True
+        return player
+
+    def receive(self, engine: Engine, command: AICommand) -> None:
+        """Adopte le coup reçu s'il concerne encore la pièce actuelle"""
+        if command.piece_id == engine.players[self.player_index].piece_id:
+            self.command = command
+            self.waiting = False
+            self.next_step = engine.clock()
+
+    def reset(self) -> None:
+        """
+        Abandonne le coup en cours et la demande en attente (nouvelle partie, IA remplacée) :
+        le coup de la pièce actuelle sera demandé à nouveau
+        """
+        self.command = None
+        self.requested_piece = 0
+        self.waiting = False
+
+    def step(self, engine: Engine) -> None:
+        """Joue une étape du coup quand elle est due ; le coup est abandonné si sa pièce a été posée"""
+        player = engine.players[self.player_index]
+        command = self.command
+        if command is None or not engine.can_move(player) or engine.clock() < self.next_step:
+            return
+        if command.piece_id != player.piece_id:
+            self.command = None
+            return
+
+        _, current_col = player.current_position
+        if player.current_rotation != command.rotation and engine.apply_action(self.player_index, Action.ROTATE):
+            delay = self.move_delay
+        elif current_col < command.column and engine.apply_action(self.player_index, Action.MOVE_RIGHT):
+            delay = self.move_delay
+        elif current_col > command.column and engine.apply_action(self.player_index, Action.MOVE_LEFT):
+            delay = self.move_delay
+        elif engine.apply_action(self.player_index, Action.STEP_DOWN):
+            delay = self.fall_delay
+        else:
+            # La pièce est arrivée : la gravité la posera
+            self.command = None
+            return
+        self.next_step = engine.clock() + delay
+
+    def deadline(self, engine: Engine) -> Optional[float]:
+        """Retourne l'instant de la prochaine étape du coup, ou None"""
+        if self.command is not None and engine.can_move(engine.players[self.player_index]):
+            return self.next_step
+        return None
+
+
+# Demande de vidage du cache de l'IA, traitée dans l'ordre des instantanés
+_CLEAR_CACHE = object()
+
+
+class BaseAIWorker:
+    """
+    File des commandes calculées hors de la boucle principale, qui les relève
+    elle-même avec poll : aucun autre thread ne l'appelle
+    """
+
+    def __init__(self):
+        """Commence avec une file de commandes vide"""
+        self.results: queue.Queue = queue.Queue()
+
+    def publish(self, command: AICommand) -> None:
+        """Dépose une commande pour la boucle principale"""
+        self.results.put(command)
+
+    def ready(self) -> bool:
+        """Indique sans rien retirer qu'une commande (ou une erreur) attend d'être relevée"""
+        return not self.results.empty()
+
+    def fail(self, error: Exception) -> None:
+        """Dépose l'erreur d'une réflexion qui a échoué, relancée par poll dans la boucle principale"""
+        self.results.put(error)
+
+    def poll(self) -> List[AICommand]:
+        """
+        Retourne sans attendre les commandes arrivées depuis le dernier appel ;
+        relance l'erreur d'une réflexion qui a échoué
+        """
+        commands = []
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return commands
+            if isinstance(result, Exception):
+                raise result
+            commands.append(result)
+
+
+class AIWorker(BaseAIWorker):
+    """
+    Fait réfléchir une IA dans un thread séparé. Le thread ne touche jamais au moteur :
+    il attend les instantanés dans une file et dépose ses commandes dans une autre
+    """
+
+    def __init__(self, ai):
+        """ai est une instance de TetrisAI, utilisée uniquement par le thread"""
+        super().__init__()
+        self.ai = ai
+        self.requests: queue.Queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        """Démarre le thread de réflexion"""
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Arrête le thread après la réflexion en cours"""
+        self.requests.put(None)
+
+    def submit(self, snapshot: AISnapshot) -> None:
+        """Demande un coup pour un instantané"""
+        self.requests.put(snapshot)
+
+    def clear_cache(self) -> None:
+        """Vide le cache de l'IA depuis son propre thread"""
+        self.requests.put(_CLEAR_CACHE)
+
+    def _run(self) -> None:
+        """Boucle du thread : bloque sur la file tant qu'il n'y a rien à calculer"""
+        while True:
+            request = self.requests.get()
+
+            # Ne garder que la demande la plus récente, les autres sont périmées
+            while request is not None and not self.requests.empty():
+                if request is _CLEAR_CACHE:
+                    self.ai.clear_cache()
+                request = self.requests.get_nowait()
+
+            if request is None:
+                return
+            if request is _CLEAR_CACHE:
+                self.ai.clear_cache()
+                continue
+
+            self.publish(plan_move(self.ai, request))
+
+
+# IA propre au processus de réflexion, créée par son initialiseur
+_process_ai: Optional[TetrisAI] = None
+
+
+def init_process_ai(ai_options: dict) -> None:
+    """
+    Initialiseur d'un processus de réflexion (ProcessPoolExecutor) : crée son IA une
+    seule fois, son cache survit donc d'un coup à l'autre
+    """
+    global _process_ai
+    # Les mesures sont enregistrées par le processus principal, à la réception des coups
+    instrumentation.disable()
+    _process_ai = TetrisAI(**ai_options)
+
+
+def plan_packed(data: bytes) -> AICommand:
+    """
+    Calcule un coup dans un processus de réflexion préparé par init_process_ai,
+    à partir d'un instantané compact (AISnapshot.pack)
+    """
+    return plan_move(_process_ai, AISnapshot.unpack(data))
+
+
+def _clear_process_cache() -> None:
+    """Vide le cache de l'IA du processus de réflexion"""
+    _process_ai.clear_cache()
+
+
+class ProcessAIWorker(BaseAIWorker):
+    """
+    Même interface que AIWorker, mais la réflexion se fait dans un processus
+    persistant : une recherche profonde ne dispute plus le GIL à l'affichage
+    """
+
+    def __init__(self, ai_options: dict):
+        """ai_options sont les paramètres de TetrisAI (depth, beam_width, ...)"""
+        super().__init__()
+        self.ai_options = ai_options
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.pending: Optional[Future] = None  # Dernière réflexion demandée
+        self.stopped = False  # Plus aucune commande n'est publiée après l'arrêt
+
+    def start(self) -> None:
+        """Démarre le processus de réflexion"""
+        self.executor = ProcessPoolExecutor(
+            max_workers=1, initializer=init_process_ai, initargs=(self.ai_options,)
+        )
+
+    def stop(self) -> None:
+        """
+        Arrête le processus après la réflexion en cours (bornée par son budget), dont le
+        résultat est ignoré ; les demandes pas encore commencées sont annulées
+        """
+        self.stopped = True
+        if self.pending is not None:
+            self.pending.cancel()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, snapshot: AISnapshot) -> None:
+        """Demande un coup ; une demande précédente pas encore commencée est annulée"""
+        if self.pending is not None:
+            self.pending.cancel()
+        self.pending = self.executor.submit(plan_packed, snapshot.pack())
+        self.pending.add_done_callback(self._done)
+
+    def clear_cache(self) -> None:
+        """Vide le cache de l'IA, dans l'ordre des demandes"""
+        if self.pending is not None:
+            self.pending.cancel()
+        self.executor.submit(_clear_process_cache)
+
+    def _done(self, future: Future) -> None:
+        """Reçoit le résultat d'une réflexion (appelé depuis un thread de l'exécuteur)"""
+        if not future.cancelled() and not self.stopped:
+            # Une erreur levée ici serait seulement journalisée par l'exécuteur : la transmettre
+            # à la boucle principale, qui attendrait sinon ce coup indéfiniment
+            try:
+                command = future.result()
+            except Exception as error:
+                self.fail(error)
+                return
+            if instrumentation.enabled:
+                instrumentation.AI_DECISION.record(command.think_time)
+                instrumentation.AI_CANDIDATES.record(command.candidates)
+            self.publish(command)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmarks des chemins critiques du moteur, de l'IA et de l'affichage.
+
+Chaque benchmark parcourt un corpus fixe de grilles issues d'une partie IA contre IA
+de graine connue : les mesures sont comparables d'une exécution à l'autre. Les résultats
+(débit, durée par opération, mémoire allouée) peuvent être sauvegardés comme référence
+puis comparés, une baisse de débit au-delà d'un seuil étant signalée comme régression.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List
+
+from constants import GRID_WIDTH, SHAPES, STANDARD_TETROMINOS, GameState
+from board import Board, FULL_ROW, column_range
+from engine import Engine, SimulatedClock, ALL_CELLS
+from renderer import Renderer
+from ai import TetrisAI, np
+
+
+@dataclass
+class BenchResult:
+    """Mesures d'un benchmark"""
+    name: str
+    operations: int  # Opérations par répétition
+    ops_per_sec: float  # Débit de la meilleure répétition
+    best_us: float  # Durée d'une opération, meilleure répétition (microsecondes)
+    median_us: float  # Durée d'une opération, répétition médiane (microsecondes)
+    alloc_bytes_per_op: float  # Mémoire allouée et conservée par opération
+    peak_kib: float  # Pic de mémoire pendant une répétition
+
+
+@dataclass
+class Benchmark:
+    """
+    Un benchmark : setup prépare (hors mesure) la liste des arguments d'une répétition,
+    run est appelé une fois par argument
+    """
+    name: str
+    setup: Callable[[], List[Any]]
+    run: Callable[[Any], Any]
+
+
+def make_corpus(size: int = 200, seed: int = 0) -> List[tuple]:
+    """
+    Retourne size positions (grille, pièce, pièce suivante) prises à chaque coup
+    d'une partie IA contre IA de graine fixe
+    """
+    engine = Engine(clock=SimulatedClock(), seed=seed)
+    ai = TetrisAI(depth=1)
+    corpus = []
+    while len(corpus) < size:
+        if engine.game.state != GameState.RUNNING:
+            engine.restart()
+        for player in engine.players:
+            corpus.append((player.grid.copy(with_colors=False), player.current_piece, player.next_piece))
+            engine.play_ai_move(player, ai)
+    return corpus[:size]
+
+
+class NullCanvas:
+    """Canevas sans affichage : mesure le coût de l'afficheur seul"""
+
+    def __init__(self):
+        """Compte les éléments créés"""
+        self.items = 0
+
+    def create_rectangle(self, *args, **kwargs) -> int:
+        """Crée un rectangle fictif"""
+        self.items += 1
+        return self.items
+
+    def create_text(self, *args, **kwargs) -> int:
+        """Crée un texte fictif"""
+        self.items += 1
+        return self.items
+
+    def itemconfig(self, item: int, **kwargs) -> None:
+        """Ignore la modification"""
+
+
+def make_benchmarks(corpus: List[tuple]) -> List[Benchmark]:
+    """Construit la liste des benchmarks sur le corpus"""
+    boards = [board for board, _, _ in corpus]
+
+    def best_move(depth: int) -> Benchmark:
+        """get_best_move sans cache de décisions, à la profondeur donnée"""
+        ai = TetrisAI(depth=depth, time_budget=10.0)
+
+        def run(position):
+            ai.clear_cache()
+            board, piece, next_piece = position
+            return ai.get_best_move(board, piece, 0, next_piece=next_piece)
+        return Benchmark(f"ai.get_best_move (profondeur {depth})", lambda: corpus, run)
+
+    # Positions où chaque grille a deux lignes complètes à effacer
+    clear_engine = Engine(clock=SimulatedClock(), seed=0)
+    clear_player = clear_engine.human_player
+
+    def clear_setup():
+        states = []
+        for board in boards:
+            rows = board.rows.copy()
+            rows[-1] = rows[-2] = FULL_ROW
+            states.append(Board.from_rows(rows))
+        return states
+
+    def clear_run(board):
+        clear_player.grid = board
+        return clear_engine.clear_lines(clear_player)
+
+    # Une pièce à chaque position de départ possible, sur chaque grille
+    valid_engine = Engine(clock=SimulatedClock(), seed=0)
+    valid_player = valid_engine.human_player
+
+    def valid_setup():
+        return [(board, piece, col) for board, piece, _ in corpus for col in range(GRID_WIDTH)]
+
+    def valid_run(state):
+        valid_player.grid, valid_player.current_piece, col = state
+        valid_player.current_rotation = 0
+        valid_player.current_position = (0, col)
+        return valid_engine.is_valid_position(valid_player, row_offset=1)
+
+    # Afficheur sur un canevas sans affichage, grilles remplies par quelques coups de l'IA
+    render_engine = Engine(clock=SimulatedClock(), seed=0)
+    render_ai = TetrisAI(depth=1)
+    for _ in range(15):
+        for player in render_engine.players:
+            render_engine.play_ai_move(player, render_ai)
+    renderer = Renderer(NullCanvas(), render_engine, 1200)
+
+    def full_frame_run(_):
+        for player in render_engine.players:
+            player.dirty_cells.update(ALL_CELLS)
+        render_engine.hud_dirty = True
+        renderer.render()
+
+    heights = [TetrisAI._get_heights(board) for board in boards]
+    evaluator = TetrisAI()
+    return [
+        best_move(1),
+        best_move(2),
+        Benchmark("ai._evaluate_position", lambda: boards, lambda board: evaluator._evaluate_position(board, 0)),
+        Benchmark("ai._get_heights", lambda: boards, TetrisAI._get_heights),
+        Benchmark("ai._get_holes", lambda: list(zip(boards, heights)), lambda args: TetrisAI._get_holes(*args)),
+        Benchmark("ai._get_bumpiness", lambda: heights, TetrisAI._get_bumpiness),
+        Benchmark("ai._get_wells", lambda: heights, TetrisAI._get_wells),
+        Benchmark("ai._get_deep_wells", lambda: heights, TetrisAI._get_deep_wells),
+        Benchmark("ai._get_top_row_blocks", lambda: boards, TetrisAI._get_top_row_blocks),
+        Benchmark("engine.clear_lines (2 lignes)", clear_setup, clear_run),
+        Benchmark("engine.is_valid_position", valid_setup, valid_run),
+        Benchmark("renderer.render (image complète)", lambda: [None] * 100, full_frame_run),
+        Benchmark("renderer.render (image inactive)", lambda: [None] * 1000, lambda _: renderer.render()),
+    ]
+
+
+def check_search_paths(corpus: List[tuple]) -> List[str]:
+    """
+    Vérifie que l'évaluation en lot (NumPy) et l'évaluation scalaire choisissent le même
+    placement, avec le même score, pour chaque pièce standard sur chaque grille du corpus
+    """
+    if np is None:
+        return []
+    ai = TetrisAI()
+    mismatches = []
+    for index, (board, _, _) in enumerate(corpus):
+        for piece in STANDARD_TETROMINOS:
+            scalar = ai._search_scalar(board, piece, 0)
+            batch = ai._search_batch(board, piece, 0)
+            if scalar != batch:
+                mismatches.append(f"position {index}, pièce {piece} : scalaire {scalar}, NumPy {batch}")
+    return mismatches
+
+
+def check_board_invariants(games: int = 100, seed: int = 0) -> List[str]:
+    """
+    Joue des placements aléatoires (avec effacements et retours en arrière) et vérifie
+    après chacun que les hauteurs, les caractéristiques et le hachage Zobrist tenus à jour
+    par la grille sont ceux d'un recalcul complet
+    """
+    rng = random.Random(seed)
+    mismatches = []
+    for game in range(games):
+        board = Board()
+        saved = None
+        for step in range(200):
+            piece = rng.choice(STANDARD_TETROMINOS)
+            rotation = rng.randrange(len(SHAPES[piece]))
+            col = rng.choice(column_range(piece, rotation))
+            if not board.is_valid_position(piece, rotation, 0, col):
+                break
+            if saved is None and rng.random() < 0.1:
+                saved = board.save()
+            board.place(piece, rotation, board.landing_row(piece, rotation, col), col, '#FFFFFF')
+            board.clear_lines()
+            if saved is not None and rng.random() < 0.2:
+                board.restore(saved)
+                saved = None
+
+            heights = TetrisAI._get_heights(board)
+            features = (
+                sum(heights), TetrisAI._get_holes(board, heights), TetrisAI._get_bumpiness(heights),
+                TetrisAI._get_wells(heights), TetrisAI._get_deep_wells(heights)
+            )
+            tracked = board.features
+            if board.heights != heights:
+                mismatches.append(f"partie {game}, coup {step} : hauteurs {board.heights} au lieu de {heights}")
+            elif (tracked.aggregate_height, tracked.holes, tracked.bumpiness, tracked.wells,
+                  tracked.deep_wells) != features:
+                mismatches.append(f"partie {game}, coup {step} : caractéristiques {tracked.save()} "
+                                  f"au lieu de {features}")
+            elif board.zobrist != Board.from_rows(board.rows).zobrist:
+                mismatches.append(f"partie {game}, coup {step} : hachage Zobrist incohérent")
+    return mismatches
+
+
+def measure(benchmark: Benchmark, repeats: int) -> BenchResult:
+    """Mesure un benchmark : meilleure et médiane de repeats répétitions, puis allocations"""
+    durations = []
+    for _ in range(repeats):
+        arguments = benchmark.setup()
+        run = benchmark.run
+        start = time.perf_counter()
+        for argument in arguments:
+            run(argument)
+        durations.append((time.perf_counter() - start) / len(arguments))
+
+    # Allocations mesurées à part : tracemalloc ralentit fortement l'exécution
+    arguments = benchmark.setup()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for argument in arguments:
+        benchmark.run(argument)
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(durations)
+    return BenchResult(
+        name=benchmark.name,
+        operations=len(arguments),
+        ops_per_sec=1 / best,
+        best_us=best * 1e6,
+        median_us=statistics.median(durations) * 1e6,
+        alloc_bytes_per_op=(after - before) / len(arguments),
+        peak_kib=(peak - before) / 1024
+    )
+
+
+def compare(results: List[BenchResult], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Retourne les benchmarks dont le débit a baissé de plus de threshold par rapport à la référence"""
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.name)
+        if reference is None:
+            continue
+        change = result.ops_per_sec / reference['ops_per_sec'] - 1
+        if change < -threshold:
+            regressions.append(f"{result.name} : {change:+.1%} ({reference['ops_per_sec']:.0f} -> {result.ops_per_sec:.0f} op/s)")
+    return regressions
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Micro-benchmarks du moteur, de l'IA et de l'affichage")
+    parser.add_argument('--repeats', type=int, default=5, help="répétitions par benchmark")
+    parser.add_argument('--corpus', type=int, default=200, help="nombre de positions du corpus")
+    parser.add_argument('--filter', help="ne lancer que les benchmarks dont le nom contient ce texte")
+    parser.add_argument('--save', help="fichier JSON où enregistrer les résultats comme référence")
+    parser.add_argument('--compare', help="fichier JSON de référence à comparer")
+    parser.add_argument('--threshold', type=float, default=0.10, help="baisse de débit tolérée (0.10 = 10%%)")
+    parser.add_argument('--no-check', action='store_true',
+                        help="ne pas vérifier la cohérence des chemins optimisés avant les mesures")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.corpus)
+    if not args.no_check:
+        # Un chemin optimisé plus rapide mais faux ne doit pas passer pour une amélioration
+        errors = check_search_paths(corpus) + check_board_invariants()
+        if errors:
+            print("Incohérences :", file=sys.stderr)
+            for error in errors[:20]:
+                print(f"  {error}", file=sys.stderr)
+            sys.exit(1)
+
+    benchmarks = make_benchmarks(corpus)
+    if args.filter:
+        benchmarks = [benchmark for benchmark in benchmarks if args.filter in benchmark.name]
+
+    results = []
+    print(f"{'benchmark':<36} {'op/s':>12} {'meilleur µs':>12} {'médian µs':>12} {'octets/op':>10} {'pic Kio':>9}")
+    for benchmark in benchmarks:
+        result = measure(benchmark, args.repeats)
+        results.append(result)
+        print(f"{result.name:<36} {result.ops_per_sec:>12.0f} {result.best_us:>12.2f} {result.median_us:>12.2f} "
+              f"{result.alloc_bytes_per_op:>10.1f} {result.peak_kib:>9.1f}")
+
+    if args.save:
+        with open(args.save, 'w') as output:
+            json.dump({result.name: asdict(result) for result in results}, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(results, json.load(baseline), args.threshold)
+        if regressions:
+            print("\nRégressions :", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print(f"\nAucune régression au-delà de {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
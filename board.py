@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Grille de jeu compacte (bitboard) pour le jeu Tetris à deux joueurs
+"""
+
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from constants import GRID_WIDTH, GRID_HEIGHT, SHAPES
+
+# Masque d'une ligne complète (un bit par colonne, bit 0 = colonne 0)
+FULL_ROW = (1 << GRID_WIDTH) - 1
+
+# Nombre de bits à 1 pour chaque masque de ligne possible
+POPCOUNT = [bin(mask).count('1') for mask in range(FULL_ROW + 1)]
+
+
+def _build_zobrist_rows(seed: int = 0x7E7815) -> List[List[int]]:
+    """
+    Précalcule, pour chaque ligne, la clé Zobrist 64 bits de chaque masque possible
+    (XOR des clés aléatoires des cellules occupées)
+    """
+    rng = random.Random(seed)
+    table = []
+    for _ in range(GRID_HEIGHT):
+        cell_keys = [rng.getrandbits(64) for _ in range(GRID_WIDTH)]
+        row_keys = [0] * (FULL_ROW + 1)
+        for mask in range(1, FULL_ROW + 1):
+            low_bit = mask & -mask
+            row_keys[mask] = row_keys[mask ^ low_bit] ^ cell_keys[low_bit.bit_length() - 1]
+        table.append(row_keys)
+    return table
+
+
+# Clés Zobrist indexées par [ligne][masque de la ligne]
+ZOBRIST_ROWS = _build_zobrist_rows()
+
+
+def shape_row_masks(shape: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Convertit une forme en liste de (ligne relative, masque de la ligne en colonne 0)"""
+    masks = {}
+    for block_row, block_col in shape:
+        masks[block_row] = masks.get(block_row, 0) | (1 << block_col)
+    return sorted(masks.items())
+
+
+@dataclass(frozen=True)
+class PieceMask:
+    """Masques précalculés d'une pièce pour une rotation et une colonne données"""
+    row_masks: Tuple[Tuple[int, int], ...]  # (ligne relative, masque décalé à la colonne)
+    columns: range  # Colonnes légales pour cette rotation
+    bottom: Tuple[Tuple[int, int], ...]  # (colonne de la grille, ligne relative du bloc le plus bas)
+    top: Tuple[Tuple[int, int], ...]  # (colonne de la grille, ligne relative du bloc le plus haut)
+    first_row: int  # Première ligne relative occupée
+    last_row: int  # Dernière ligne relative occupée
+
+
+def _build_piece_masks() -> Dict[Tuple[str, int, int], PieceMask]:
+    """Précalcule les masques de chaque (pièce, rotation, colonne légale)"""
+    table = {}
+    for piece_type, rotations in SHAPES.items():
+        for rotation, shape in enumerate(rotations):
+            row_masks = shape_row_masks(shape)
+            min_col = min(col for _, col in shape)
+            max_col = max(col for _, col in shape)
+            columns = range(-min_col, GRID_WIDTH - max_col)
+
+            # Profils inférieur et supérieur : blocs extrêmes de chaque colonne de la pièce
+            lowest = {}
+            highest = {}
+            for block_row, block_col in shape:
+                lowest[block_col] = max(lowest.get(block_col, block_row), block_row)
+                highest[block_col] = min(highest.get(block_col, block_row), block_row)
+
+            for col in columns:
+                table[(piece_type, rotation, col)] = PieceMask(
+                    row_masks=tuple((block_row, mask << col) for block_row, mask in row_masks),
+                    columns=columns,
+                    bottom=tuple((block_col + col, block_row) for block_col, block_row in sorted(lowest.items())),
+                    top=tuple((block_col + col, block_row) for block_col, block_row in sorted(highest.items())),
+                    first_row=row_masks[0][0],
+                    last_row=row_masks[-1][0]
+                )
+    return table
+
+
+# Table des masques, indexée par (pièce, rotation, colonne)
+PIECE_MASKS = _build_piece_masks()
+
+# Colonnes légales, indexées par (pièce, rotation)
+COLUMN_RANGES = {(piece_type, rotation): entry.columns for (piece_type, rotation, _), entry in PIECE_MASKS.items()}
+
+
+def column_range(piece_type: str, rotation: int) -> range:
+    """Retourne les colonnes légales d'une pièce pour une rotation"""
+    return COLUMN_RANGES[(piece_type, rotation)]
+
+
+def _neighbour_floor(heights: List[int], col: int) -> int:
+    """Retourne la plus petite hauteur parmi les colonnes voisines"""
+    if col == 0:
+        return heights[1]
+    if col == GRID_WIDTH - 1:
+        return heights[col - 1]
+    return min(heights[col - 1], heights[col + 1])
+
+
+def is_well(heights: List[int], col: int) -> bool:
+    """Indique si une colonne est un puits (voisines plus hautes d'au moins 2 blocs)"""
+    return heights[col] < _neighbour_floor(heights, col) - 1
+
+
+def is_deep_well(heights: List[int], col: int) -> bool:
+    """Indique si une colonne est un puits profond (au moins 3 blocs de profondeur)"""
+    return heights[col] + 3 <= _neighbour_floor(heights, col)
+
+
+class BoardFeatures:
+    """
+    Caractéristiques de la grille utilisées par l'évaluation de l'IA,
+    tenues à jour colonne par colonne lors des placements et des effacements
+    """
+
+    __slots__ = ('aggregate_height', 'filled', 'bumpiness', 'wells', 'deep_wells')
+
+    def __init__(self):
+        """Crée les caractéristiques d'une grille vide"""
+        self.aggregate_height = 0  # Somme des hauteurs des colonnes
+        self.filled = 0  # Nombre de cellules occupées
+        self.bumpiness = 0  # Somme des écarts de hauteur entre colonnes voisines
+        self.wells = 0  # Nombre de puits
+        self.deep_wells = 0  # Nombre de puits profonds
+
+    @property
+    def holes(self) -> int:
+        """Nombre de trous : cellules vides sous le sommet de leur colonne"""
+        return self.aggregate_height - self.filled
+
+    def reset(self, heights: List[int], filled: int) -> None:
+        """Recalcule toutes les caractéristiques à partir des hauteurs (O(largeur))"""
+        self.aggregate_height = sum(heights)
+        self.filled = filled
+        self.bumpiness = 0
+        self.wells = 0
+        self.deep_wells = 0
+        self._add_terms(heights, 0, GRID_WIDTH - 1, 1)
+
+    def remove_columns(self, heights: List[int], first_col: int, last_col: int) -> None:
+        """Retire la contribution des colonnes first_col..last_col et de leurs voisines"""
+        self._add_terms(heights, first_col, last_col, -1)
+        for col in range(first_col, last_col + 1):
+            self.aggregate_height -= heights[col]
+
+    def add_columns(self, heights: List[int], first_col: int, last_col: int) -> None:
+        """Ajoute la contribution des colonnes first_col..last_col et de leurs voisines"""
+        self._add_terms(heights, first_col, last_col, 1)
+        for col in range(first_col, last_col + 1):
+            self.aggregate_height += heights[col]
+
+    def _add_terms(self, heights: List[int], first_col: int, last_col: int, sign: int) -> None:
+        """Ajoute (ou retire) les termes de voisinage qui dépendent des colonnes données"""
+        for col in range(max(first_col - 1, 0), min(last_col, GRID_WIDTH - 2) + 1):
+            self.bumpiness += sign * abs(heights[col] - heights[col + 1])
+        for col in range(max(first_col - 1, 0), min(last_col + 1, GRID_WIDTH - 1) + 1):
+            if is_well(heights, col):
+                self.wells += sign
+            if is_deep_well(heights, col):
+                self.deep_wells += sign
+
+    def save(self) -> Tuple[int, int, int, int, int]:
+        """Retourne un état restaurable des caractéristiques"""
+        return (self.aggregate_height, self.filled, self.bumpiness, self.wells, self.deep_wells)
+
+    def restore(self, state: Tuple[int, int, int, int, int]) -> None:
+        """Restaure un état obtenu avec save()"""
+        self.aggregate_height, self.filled, self.bumpiness, self.wells, self.deep_wells = state
+
+
+class Board:
+    """
+    Grille de jeu représentée par un masque entier par ligne.
+    Une grille de couleurs séparée n'est conservée que pour l'affichage.
+    """
+
+    __slots__ = ('rows', 'colors', 'heights', 'features', '_zobrist')
+
+    def __init__(self, with_colors: bool = True):
+        """Crée une grille vide"""
+        self.rows: List[int] = [0] * GRID_HEIGHT
+        self.heights: List[int] = [0] * GRID_WIDTH  # Hauteur de chaque colonne, tenue à jour
+        self.features = BoardFeatures()
+        self._zobrist = 0  # Hachage Zobrist de l'occupation, tenu à jour
+        self.colors: Optional[List[List[str]]] = None
+        if with_colors:
+            self.colors = [['' for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+
+    @classmethod
+    def from_rows(cls, rows: List[int]) -> 'Board':
+        """Reconstruit une grille sans couleurs à partir de ses masques de lignes"""
+        board = cls(with_colors=False)
+        board.rows = list(rows)
+        board._rebuild()
+        return board
+
+    def copy(self, with_colors: bool = True) -> 'Board':
+        """Retourne une copie de la grille (sans les couleurs si inutiles)"""
+        board = Board(with_colors=False)
+        board.rows = self.rows.copy()
+        board.heights = self.heights.copy()
+        board.features.restore(self.features.save())
+        board._zobrist = self._zobrist
+        if with_colors and self.colors is not None:
+            board.colors = [row.copy() for row in self.colors]
+        return board
+
+    def save(self) -> tuple:
+        """
+        Retourne un état restaurable de l'occupation de la grille.
+        La grille de couleurs n'en fait pas partie : réservé aux copies de simulation.
+        """
+        return (self.rows.copy(), self.heights.copy(), self.features.save(), self._zobrist)
+
+    def restore(self, state: tuple) -> None:
+        """Annule les modifications faites depuis l'appel à save()"""
+        rows, heights, features, zobrist = state
+        self.rows = rows.copy()
+        self.heights = heights.copy()
+        self.features.restore(features)
+        self._zobrist = zobrist
+
+    @property
+    def zobrist(self) -> int:
+        """Hachage 64 bits de l'occupation de la grille"""
+        return self._zobrist
+
+    def is_occupied(self, row: int, col: int) -> bool:
+        """Indique si une cellule est occupée"""
+        return bool(self.rows[row] >> col & 1)
+
+    def is_valid_position(self, piece_type: str, rotation: int, row: int, col: int) -> bool:
+        """Vérifie si une pièce peut être placée à la position donnée"""
+        # Une colonne absente de la table est hors de la grille
+        entry = PIECE_MASKS.get((piece_type, rotation, col))
+        if entry is None:
+            return False
+
+        # Vérifier si la pièce dépasse en haut ou en bas
+        if row + entry.first_row < 0 or row + entry.last_row >= GRID_HEIGHT:
+            return False
+
+        rows = self.rows
+        for block_row, mask in entry.row_masks:
+            if rows[row + block_row] & mask:
+                return False
+
+        return True
+
+    def landing_row(self, piece_type: str, rotation: int, col: int, from_row: int = 0) -> int:
+        """
+        Calcule la ligne où une pièce s'arrête en tombant depuis from_row
+        à partir des hauteurs de colonnes et du profil inférieur de la pièce
+        """
+        entry = PIECE_MASKS[(piece_type, rotation, col)]
+        heights = self.heights
+        landing = min(GRID_HEIGHT - heights[grid_col] - block_row - 1 for grid_col, block_row in entry.bottom)
+        if landing >= from_row:
+            return landing
+
+        # La pièce est déjà sous la surface (sous un surplomb) : descendre ligne par ligne
+        row = from_row
+        while self.is_valid_position(piece_type, rotation, row + 1, col):
+            row += 1
+        return row
+
+    def place(self, piece_type: str, rotation: int, row: int, col: int, color: Optional[str] = None) -> None:
+        """Place une pièce dans la grille (les blocs hors de la grille sont ignorés)"""
+        entry = PIECE_MASKS.get((piece_type, rotation, col))
+        incremental = entry is not None and row + entry.first_row >= 0 and row + entry.last_row < GRID_HEIGHT
+        if incremental:
+            row_masks = entry.row_masks
+
+            # Mettre à jour les hauteurs et les caractéristiques des colonnes touchées
+            heights = self.heights
+            features = self.features
+            first_col = entry.top[0][0]
+            last_col = entry.top[-1][0]
+            features.remove_columns(heights, first_col, last_col)
+            for grid_col, block_row in entry.top:
+                height = GRID_HEIGHT - row - block_row
+                if height > heights[grid_col]:
+                    heights[grid_col] = height
+            features.add_columns(heights, first_col, last_col)
+        else:
+            # Pièce partiellement hors de la grille : tout recalculer après placement
+            row_masks = [
+                (block_row, (mask << col if col >= 0 else mask >> -col) & FULL_ROW)
+                for block_row, mask in shape_row_masks(SHAPES[piece_type][rotation])
+            ]
+
+        added = 0
+        for block_row, shifted in row_masks:
+            grid_row = row + block_row
+            if not 0 <= grid_row < GRID_HEIGHT:
+                continue
+
+            new_blocks = shifted & ~self.rows[grid_row]
+            added += POPCOUNT[new_blocks]
+            self._zobrist ^= ZOBRIST_ROWS[grid_row][new_blocks]
+            self.rows[grid_row] |= shifted
+
+            if self.colors is not None and color is not None:
+                color_row = self.colors[grid_row]
+                for grid_col in range(GRID_WIDTH):
+                    if shifted >> grid_col & 1:
+                        color_row[grid_col] = color
+
+        if incremental:
+            self.features.filled += added
+        else:
+            self._rebuild()
+
+    def clear_lines(self) -> int:
+        """Efface les lignes complètes et retourne le nombre de lignes effacées"""
+        kept = [index for index, mask in enumerate(self.rows) if mask != FULL_ROW]
+        lines_cleared = GRID_HEIGHT - len(kept)
+        if lines_cleared == 0:
+            return 0
+        first_cleared = next(index for index, mask in enumerate(self.rows) if mask == FULL_ROW)
+
+        # Les colonnes dont le sommet est au-dessus de la première ligne effacée perdent
+        # exactement une hauteur par ligne effacée ; les autres sont à rechercher
+        rescan = 0
+        heights = self.heights
+        for col in range(GRID_WIDTH):
+            if GRID_HEIGHT - heights[col] < first_cleared:
+                heights[col] -= lines_cleared
+            else:
+                rescan |= 1 << col
+
+        # Faire descendre les lignes restantes et ajouter des lignes vides en haut
+        self.rows = [0] * lines_cleared + [self.rows[index] for index in kept]
+        if self.colors is not None:
+            self.colors = (
+                [['' for _ in range(GRID_WIDTH)] for _ in range(lines_cleared)] +
+                [self.colors[index] for index in kept]
+            )
+
+        if rescan:
+            self._compute_heights(first_cleared + lines_cleared, rescan)
+        self._compute_zobrist()
+
+        # Toutes les hauteurs ont changé : recalcul en O(largeur)
+        self.features.reset(heights, self.features.filled - lines_cleared * GRID_WIDTH)
+
+        return lines_cleared
+
+    def _rebuild(self) -> None:
+        """Recalcule les hauteurs et les caractéristiques à partir des lignes"""
+        self._compute_heights(0, FULL_ROW)
+        self.features.reset(self.heights, sum(POPCOUNT[mask] for mask in self.rows))
+        self._compute_zobrist()
+
+    def _compute_zobrist(self) -> None:
+        """Recalcule le hachage Zobrist avec une consultation de table par ligne"""
+        zobrist = 0
+        for row, mask in enumerate(self.rows):
+            if mask:
+                zobrist ^= ZOBRIST_ROWS[row][mask]
+        self._zobrist = zobrist
+
+    def _compute_heights(self, start_row: int, columns: int) -> None:
+        """Recalcule la hauteur des colonnes du masque columns à partir de start_row"""
+        heights = self.heights
+        pending = columns
+        for col in range(GRID_WIDTH):
+            if pending >> col & 1:
+                heights[col] = 0
+
+        for row in range(start_row, GRID_HEIGHT):
+            found = self.rows[row] & pending
+            if not found:
+                continue
+            for col in range(GRID_WIDTH):
+                if found >> col & 1:
+                    heights[col] = GRID_HEIGHT - row
+            pending &= ~found
+            if not pending:
+                break
@@ -18,6 +18,10 @@ SCOREBOARD_PADDING = 10
 PREVIEW_SIZE = 4
 PREVIEW_PADDING = 10
 
+# Durées des effets spéciaux (en secondes)
+RAINBOW_INTERVAL = 120  # L'effet arc-en-ciel revient toutes les 2 minutes
+RAINBOW_DURATION = 20
+
 # Couleurs des pièces (format RGB en hexadécimal)
 COLORS = {
     'I': '#00FFFF',  # Cyan
@@ -84,6 +88,11 @@ STANDARD_TETROMINOS = ['I', 'J', 'L', 'O', 'S', 'T', 'Z']
 EASY_TETROMINOS = ['I', 'O']  # Pièces "faciles"
 SPECIAL_TETROMINOS = ['HEART', 'STAR']  # Pièces spéciales
 
+# Numéro de chaque type de pièce dans les formats binaires (instantanés de l'IA, replays)
+PIECE_NAMES = list(SHAPES)
+PIECE_CODES = {name: code for code, name in enumerate(PIECE_NAMES)}
+NO_PIECE = 255
+
 class PlayerType(Enum):
     """Enumération des types de joueurs"""
     HUMAN = auto()
@@ -93,4 +102,15 @@ class GameState(Enum):
     """Enumération des états du jeu"""
     RUNNING = auto()
     PAUSED = auto()
-    GAME_OVER = auto()
\ No newline at end of file
+    GAME_OVER = auto()
+
+class Action(Enum):
+    """Enumération des actions d'un joueur (les valeurs font partie du format des replays)"""
+    MOVE_LEFT = 1
+    MOVE_RIGHT = 2
+    MOVE_DOWN = 3
+    ROTATE = 4
+    DROP = 5
+    STEP_DOWN = 6  # Descente d'une ligne sans jamais poser la pièce (animation de l'IA)
+    PAUSE = 7
+    RESTART = 8
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Moteur de jeu Tetris à deux joueurs, indépendant de Tkinter
+"""
+
+import random
+import time
+from typing import Callable, List, Optional, Tuple
+
+from constants import (
+    GRID_WIDTH, GRID_HEIGHT, RAINBOW_INTERVAL, RAINBOW_DURATION, COLORS, SHAPES, EASY_TETROMINOS, SPECIAL_TETROMINOS,
+    PlayerType, GameState, Action
+)
+from models import Player, GameSession
+from board import Board, FULL_ROW
+from randomizer import RANDOMIZERS, PieceQueue
+
+# Toutes les cellules d'une grille, pour un redessin complet
+ALL_CELLS = [(row, col) for row in range(GRID_HEIGHT) for col in range(GRID_WIDTH)]
+
+
+class SimulatedClock:
+    """Horloge simulée, avancée manuellement (parties sans interface, rejeu)"""
+
+    def __init__(self, start: float = 0.0):
+        """Crée une horloge positionnée à start secondes"""
+        self.now = start
+
+    def __call__(self) -> float:
+        """Retourne le temps simulé actuel"""
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        """Fait avancer le temps simulé"""
+        self.now += seconds
+
+
+class Engine:
+    """
+    Moteur de jeu : possède la session et les joueurs, applique toutes les règles
+    et avance par ticks discrets. Le temps et le hasard sont injectés : avec la même
+    horloge, la même graine et les mêmes actions, deux parties sont identiques.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time, seed: Optional[int] = None,
+                 fall_speed: float = 1.0, randomizer: str = 'uniform', queue_size: int = 5):
+        """
+        Initialise le moteur avec une horloge et une graine (tirée au hasard si absente).
+        randomizer choisit le générateur des pièces standard (voir RANDOMIZERS) et
+        queue_size le nombre de pièces connues à l'avance après la prochaine.
+        """
+        if randomizer not in RANDOMIZERS:
+            raise ValueError(f"Générateur de pièces inconnu : {randomizer}")
+        self.clock = clock
+        self.seed = seed if seed is not None else random.randrange(2 ** 63)
+        self.rng = random.Random(self.seed)
+        self.randomizer = randomizer
+        self.queue_size = queue_size
+        self.fall_speed = fall_speed  # En secondes
+        self.max_catch_up_steps = 5  # Chutes rattrapées au plus par joueur et par tick en retard
+
+        # Initialiser les joueurs
+        self.human_player = Player(type=PlayerType.HUMAN, grid=Board())
+        self.ai_player = Player(type=PlayerType.AI, grid=Board())
+
+        # Initialiser la session de jeu
+        self.game = GameSession(
+            human_player=self.human_player,
+            ai_player=self.ai_player,
+            state=GameState.RUNNING
+        )
+
+        # Variables de jeu
+        self.rainbow_mode = False
+        self.last_tick_time = self.clock()
+        self.hud_dirty = True  # Scores, prévisualisations ou état du jeu à redessiner
+
+        # Enregistreur de replay (ReplayRecorder), notifié des ticks, actions et pièces
+        self.recorder = None
+
+        # Compteurs d'exploitation (metrics.GameMetrics), notifiés des parties et des pièces posées
+        self.metrics = None
+
+        self.restart()
+
+    @property
+    def players(self) -> Tuple[Player, Player]:
+        """Retourne les deux joueurs (humain, IA)"""
+        return self.human_player, self.ai_player
+
+    def opponent(self, player: Player) -> Player:
+        """Retourne l'adversaire d'un joueur"""
+        return self.ai_player if player is self.human_player else self.human_player
+
+    def player_index(self, player: Player) -> int:
+        """Retourne le numéro d'un joueur (0 = humain, 1 = IA)"""
+        return 0 if player is self.human_player else 1
+
+    def apply_action(self, player_index: int, action: Action) -> bool:
+        """
+        Applique une action d'un joueur (0 = humain, 1 = IA) et l'enregistre si un replay
+        est en cours. Toutes les entrées du jeu passent par ici, pour pouvoir être rejouées.
+        """
+        if self.recorder is not None:
+            self.recorder.record_action(self.clock(), player_index, action)
+
+        if action == Action.PAUSE:
+            self.toggle_pause()
+            return True
+        if action == Action.RESTART:
+            self.restart()
+            return True
+
+        player = self.players[player_index]
+        if action == Action.MOVE_LEFT:
+            return self.move_left(player)
+        if action == Action.MOVE_RIGHT:
+            return self.move_right(player)
+        if action == Action.MOVE_DOWN:
+            return self.move_down(player)
+        if action == Action.ROTATE:
+            return self.rotate(player)
+        if action == Action.DROP:
+            return self.drop(player)
+        if action == Action.STEP_DOWN:
+            return self.can_move(player) and self.step_down(player)
+        raise ValueError(f"Action inconnue : {action}")
+
+    def restart(self) -> None:
+        """Redémarre la partie"""
+        for player in self.players:
+            # Réinitialiser la grille, les scores et les pièces
+            player.grid = Board()
+            player.score = 0
+            player.lines_cleared = 0
+            player.pieces_placed = 0
+            player.current_piece = None
+            player.next_piece = None
+
+            # Chaque joueur a son propre générateur, dérivé de la graine de la partie
+            player.piece_queue = PieceQueue(
+                RANDOMIZERS[self.randomizer](random.Random(self.rng.getrandbits(64))), self.queue_size
+            )
+
+            # Réinitialiser les modificateurs de vitesse et les cadeaux surprises
+            player.speed_modifier = 1.0
+            player.speed_modifier_end_time = 0
+            player.gift_next_piece = False
+            player.fall_accumulator = 0
+
+            # Tout redessiner
+            player.dirty_cells.update(ALL_CELLS)
+
+        # Réinitialiser l'effet arc-en-ciel
+        self.rainbow_mode = False
+
+        # Réinitialiser l'état du jeu (une seule lecture de l'horloge pour tous les instants)
+        current_time = self.clock()
+        self.game.state = GameState.RUNNING
+        self.game.start_time = current_time
+        # Le premier effet arc-en-ciel arrive un intervalle après le début de la partie
+        self.game.last_rainbow_time = self.game.start_time
+        self.game.last_special_piece_time = {
+            PlayerType.HUMAN: 0,
+            PlayerType.AI: 0
+        }
+
+        # Générer de nouvelles pièces pour les deux joueurs
+        for player in self.players:
+            self.generate_new_piece(player)
+
+        # Réinitialiser l'horloge de la gravité
+        self.last_tick_time = current_time
+        self.hud_dirty = True
+
+        if self.metrics is not None:
+            self.metrics.game_started()
+
+    def toggle_pause(self) -> None:
+        """Met le jeu en pause ou le reprend"""
+        if self.game.state == GameState.RUNNING:
+            self.game.state = GameState.PAUSED
+        elif self.game.state == GameState.PAUSED:
+            self.game.state = GameState.RUNNING
+            # Le temps passé en pause ne compte pas pour la gravité
+            self.last_tick_time = self.clock()
+        self.hud_dirty = True
+
+    def mark_piece_dirty(self, player: Player) -> None:
+        """Marque les cellules couvertes par la pièce actuelle comme à redessiner"""
+        row_offset, col_offset = player.current_position
+        player.dirty_cells.update(
+            (row + row_offset, col + col_offset) for row, col in self.get_piece_coordinates(player)
+            if 0 <= row + row_offset < GRID_HEIGHT and 0 <= col + col_offset < GRID_WIDTH
+        )
+
+    def can_move(self, player: Player) -> bool:
+        """Indique si le joueur peut agir sur sa pièce"""
+        return self.game.state == GameState.RUNNING and bool(player.current_piece)
+
+    def get_piece_coordinates(self, player: Player) -> List[Tuple[int, int]]:
+        """Obtient les coordonnées de la pièce actuelle d'un joueur"""
+        if not player.current_piece:
+            return []
+
+        rotation_index = player.current_rotation % len(SHAPES[player.current_piece])
+        return SHAPES[player.current_piece][rotation_index]
+
+    def is_valid_position(self, player: Player, row_offset: int = 0, col_offset: int = 0,
+                          rotation_offset: int = 0) -> bool:
+        """Vérifie si la position est valide pour la pièce actuelle"""
+        if not player.current_piece:
+            return False
+
+        # Calculer la nouvelle rotation
+        new_rotation = (player.current_rotation + rotation_offset) % len(SHAPES[player.current_piece])
+
+        # Calculer la nouvelle position
+        current_row, current_col = player.current_position
+        new_row = current_row + row_offset
+        new_col = current_col + col_offset
+
+        # Vérifier les collisions ligne par ligne sur le bitboard
+        return player.grid.is_valid_position(player.current_piece, new_rotation, new_row, new_col)
+
+    def move_left(self, player: Player) -> bool:
+        """Déplace la pièce vers la gauche, retourne True si elle a bougé"""
+        return self._shift(player, -1)
+
+    def move_right(self, player: Player) -> bool:
+        """Déplace la pièce vers la droite, retourne True si elle a bougé"""
+        return self._shift(player, 1)
+
+    def _shift(self, player: Player, col_offset: int) -> bool:
+        """Décale la pièce horizontalement si possible"""
+        if not self.can_move(player) or not self.is_valid_position(player, col_offset=col_offset):
+            return False
+
+        self.mark_piece_dirty(player)
+        current_row, current_col = player.current_position
+        player.current_position = (current_row, current_col + col_offset)
+        self.mark_piece_dirty(player)
+        return True
+
+    def move_down(self, player: Player) -> bool:
+        """Déplace la pièce vers le bas, ou la place si elle ne peut plus descendre"""
+        if not self.can_move(player):
+            return False
+
+        if not self.step_down(player):
+            self.place_piece(player)
+        return True
+
+    def step_down(self, player: Player) -> bool:
+        """Descend la pièce d'une ligne si possible, sans jamais la placer"""
+        if not self.is_valid_position(player, row_offset=1):
+            return False
+
+        self.mark_piece_dirty(player)
+        current_row, current_col = player.current_position
+        player.current_position = (current_row + 1, current_col)
+        self.mark_piece_dirty(player)
+        return True
+
+    def rotate(self, player: Player) -> bool:
+        """Fait pivoter la pièce, retourne True si elle a pivoté"""
+        if not self.can_move(player) or not self.is_valid_position(player, rotation_offset=1):
+            return False
+
+        self.mark_piece_dirty(player)
+        player.current_rotation = (player.current_rotation + 1) % len(SHAPES[player.current_piece])
+        self.mark_piece_dirty(player)
+        return True
+
+    def drop(self, player: Player) -> bool:
+        """Fait tomber la pièce instantanément et la place"""
+        if not self.can_move(player):
+            return False
+
+        # Calculer la ligne d'arrivée en une passe sur les hauteurs de colonnes
+        self.mark_piece_dirty(player)
+        player.current_position = (self.landing_row(player), player.current_position[1])
+        self.mark_piece_dirty(player)
+
+        # Placer la pièce
+        self.place_piece(player)
+        return True
+
+    def landing_row(self, player: Player) -> int:
+        """Retourne la ligne où la pièce actuelle s'arrêterait en tombant"""
+        current_row, current_col = player.current_position
+        rotation_index = player.current_rotation % len(SHAPES[player.current_piece])
+        return player.grid.landing_row(player.current_piece, rotation_index, current_col, current_row)
+
+    def remaining_fall_time(self, player: Player) -> float:
+        """Temps avant que la gravité ne pose la pièce actuelle si personne n'y touche"""
+        fall_time = self.fall_speed * player.speed_modifier
+        rows_left = self.landing_row(player) - player.current_position[0]
+        return (rows_left + 1) * fall_time - player.fall_accumulator
+
+    def place_piece(self, player: Player) -> None:
+        """Place la pièce actuelle dans la grille"""
+        if not player.current_piece:
+            return
+
+        # Placer la pièce dans la grille (les blocs hors de la grille sont ignorés)
+        row_offset, col_offset = player.current_position
+        rotation_index = player.current_rotation % len(SHAPES[player.current_piece])
+        player.grid.place(
+            player.current_piece, rotation_index, row_offset, col_offset,
+            COLORS[player.current_piece]
+        )
+        player.pieces_placed += 1
+
+        # Vérifier les lignes complètes
+        lines_cleared = self.clear_lines(player)
+
+        # Mettre à jour le score
+        if lines_cleared > 0:
+            # Système de score progressif
+            if lines_cleared == 1:
+                player.score += 50
+            elif lines_cleared == 2:
+                player.score += 100
+                # Règle du cadeau surprise : si un joueur complète exactement 2 lignes
+                # son adversaire reçoit une pièce facile lors de son prochain tour
+                self.opponent(player).gift_next_piece = True
+            elif lines_cleared == 3:
+                player.score += 200
+            elif lines_cleared == 4:
+                player.score += 300
+
+            player.lines_cleared += lines_cleared
+            self.hud_dirty = True
+
+            # Vérifier si on doit activer la pause douceur (tous les 1000 points)
+            if (player.score % 1000 < 50 and player.score > 0):
+                # Ralentir les deux joueurs pendant 10 secondes
+                current_time = self.clock()
+                for slowed_player in self.players:
+                    slowed_player.speed_modifier = 0.5
+                    slowed_player.speed_modifier_end_time = current_time + 10
+
+        if self.metrics is not None:
+            self.metrics.piece_placed(self.player_index(player), lines_cleared, player.score)
+
+        # Vérifier si le jeu est terminé (si la pièce dépasse le haut de la grille)
+        if row_offset <= 0:
+            self.game.state = GameState.GAME_OVER
+            self.hud_dirty = True
+            if self.metrics is not None:
+                self.metrics.game_over()
+            return
+
+        # Générer une nouvelle pièce
+        self.generate_new_piece(player)
+
+    def clear_lines(self, player: Player) -> int:
+        """Efface les lignes complètes et retourne le nombre de lignes effacées"""
+        full_rows = [row for row, mask in enumerate(player.grid.rows) if mask == FULL_ROW]
+        if not full_rows:
+            return 0
+
+        # Toutes les lignes au-dessus de la plus basse ligne effacée descendent
+        player.dirty_cells.update(ALL_CELLS[:(full_rows[-1] + 1) * GRID_WIDTH])
+        return player.grid.clear_lines()
+
+    def generate_new_piece(self, player: Player) -> None:
+        """Génère une nouvelle pièce pour un joueur"""
+        # Utiliser la pièce suivante si elle existe
+        if player.next_piece:
+            player.current_piece = player.next_piece
+        else:
+            # Sinon, générer une pièce aléatoire
+            player.current_piece = self.get_random_piece(player)
+
+        if self.recorder is not None:
+            self.recorder.record_piece(self.player_index(player), player.current_piece)
+
+        # Générer la prochaine pièce
+        player.next_piece = self.get_random_piece(player)
+
+        # Réinitialiser la rotation et la position
+        player.current_rotation = 0
+
+        # Calculer la position initiale (centrer horizontalement)
+        shape = SHAPES[player.current_piece][0]
+        min_col = min(col for _, col in shape)
+        max_col = max(col for _, col in shape)
+        piece_width = max_col - min_col + 1
+        col_offset = (GRID_WIDTH - piece_width) // 2
+
+        player.current_position = (0, col_offset)
+        player.piece_id += 1
+
+        # Redessiner la nouvelle pièce et la prévisualisation
+        self.mark_piece_dirty(player)
+        self.hud_dirty = True
+
+    def get_random_piece(self, player: Player) -> str:
+        """
+        Retourne la pièce suivante : la pièce facile du cadeau surprise ou une pièce
+        spéciale si leurs règles s'appliquent, sinon la prochaine de la file du joueur
+        """
+        current_time = self.clock()
+
+        # Vérifier si le joueur doit recevoir une pièce facile (cadeau surprise)
+        if player.gift_next_piece:
+            player.gift_next_piece = False
+            return self.rng.choice(EASY_TETROMINOS)
+
+        # Vérifier si on doit générer une pièce spéciale
+        # (20% de chance tous les 3000 points, mais pas plus d'une fois toutes les 30 secondes)
+        if (player.score >= self.game.special_piece_threshold and
+            current_time - self.game.last_special_piece_time[player.type] > 30 and
+            self.rng.random() < 0.2):
+            self.game.last_special_piece_time[player.type] = current_time
+            return self.rng.choice(SPECIAL_TETROMINOS)
+
+        # Sinon, prendre la prochaine pièce standard de la file
+        return player.piece_queue.pop()
+
+    def tick(self) -> None:
+        """Avance le jeu jusqu'à l'instant donné par l'horloge : gravité et effets"""
+        if self.game.state != GameState.RUNNING:
+            return
+
+        current_time = self.clock()
+        if self.recorder is not None:
+            self.recorder.record_tick(current_time)
+
+        elapsed_time = current_time - self.last_tick_time
+        self.last_tick_time = current_time
+
+        # Chaque joueur a sa propre gravité : le temps écoulé s'accumule et chaque
+        # intervalle de chute complet (selon son modificateur de vitesse) descend la pièce
+        for player in self.players:
+            fall_time = self.fall_speed * player.speed_modifier
+            player.fall_accumulator += elapsed_time
+
+            # Rattraper les chutes manquées si le tick est en retard, dans la limite du plafond
+            steps = 0
+            while player.fall_accumulator >= fall_time and self.game.state == GameState.RUNNING:
+                if steps == self.max_catch_up_steps:
+                    # Abandonner le retard restant plutôt que de le rattraper d'un coup
+                    player.fall_accumulator %= fall_time
+                    break
+
+                player.fall_accumulator -= fall_time
+                steps += 1
+                if player.current_piece and not self.step_down(player):
+                    self.place_piece(player)
+
+            if self.game.state != GameState.RUNNING:
+                return
+
+        # Vérifier si l'effet de vitesse de chaque joueur a expiré
+        for player in self.players:
+            if player.speed_modifier != 1.0 and current_time >= player.speed_modifier_end_time:
+                player.speed_modifier = 1.0
+                self.hud_dirty = True
+
+        # Vérifier si le mode arc-en-ciel doit être désactivé
+        if self.rainbow_mode and current_time - self.game.last_rainbow_time >= RAINBOW_DURATION:
+            self.rainbow_mode = False
+            self.hud_dirty = True
+
+        # Vérifier si on doit activer l'effet arc-en-ciel (toutes les 2 minutes)
+        if not self.rainbow_mode and current_time >= self.game.last_rainbow_time + RAINBOW_INTERVAL:
+            self.rainbow_mode = True
+            # Rester aligné sur les multiples de l'intervalle depuis le début de la partie
+            game_duration = current_time - self.game.start_time
+            self.game.last_rainbow_time = current_time - game_duration % RAINBOW_INTERVAL
+            self.hud_dirty = True
+
+    def next_deadline(self) -> Optional[float]:
+        """
+        Retourne l'instant du prochain événement programmé (chute d'une pièce,
+        fin d'un effet de vitesse, début ou fin de l'effet arc-en-ciel),
+        ou None si rien ne peut arriver sans action du joueur (pause, Game Over)
+        """
+        if self.game.state != GameState.RUNNING:
+            return None
+
+        deadlines = []
+        for player in self.players:
+            if player.current_piece:
+                deadlines.append(self.last_tick_time + self.fall_speed * player.speed_modifier - player.fall_accumulator)
+            if player.speed_modifier != 1.0:
+                deadlines.append(player.speed_modifier_end_time)
+
+        if self.rainbow_mode:
+            deadlines.append(self.game.last_rainbow_time + RAINBOW_DURATION)
+        else:
+            deadlines.append(self.game.last_rainbow_time + RAINBOW_INTERVAL)
+
+        return min(deadlines)
+
+    def play_ai_move(self, player: Player, ai) -> bool:
+        """
+        Joue immédiatement le coup choisi par une IA (TetrisAI) pour un joueur :
+        rotation, déplacement horizontal puis chute instantanée
+        """
+        if not self.can_move(player):
+            return False
+
+        best_rotation, best_column, _ = ai.get_best_move(
+            player.grid, player.current_piece, player.current_rotation, next_piece=player.next_piece
+        )
+
+        # Appliquer la rotation puis le déplacement tant que c'est possible
+        while player.current_rotation != best_rotation and self.rotate(player):
+            pass
+        while player.current_position[1] < best_column and self.move_right(player):
+            pass
+        while player.current_position[1] > best_column and self.move_left(player):
+            pass
+
+        return self.drop(player)
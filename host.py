@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hébergement de nombreuses parties IA contre IA simultanées dans un seul processus,
+par exemple pour un serveur de tournoi.
+
+Toutes les parties partagent une boucle asyncio : chacune n'a qu'un réveil programmé
+(call_at) à la prochaine échéance de son moteur, comme TetrisGame avec root.after,
+et aucun thread. Les réflexions de l'IA partent sous forme d'instantanés compacts
+vers un petit pool de processus partagé par toutes les parties.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+from constants import GameState
+from engine import Engine, SimulatedClock
+from ai import TetrisAI
+from ai_worker import AISnapshot, AIPilot, plan_move, init_process_ai, plan_packed
+from randomizer import RANDOMIZERS
+
+
+@dataclass
+class SessionResult:
+    """Résultat d'une partie hébergée"""
+    session_id: int
+    seed: int
+    scores: List[int]  # Score de chaque joueur
+    lines_cleared: List[int]  # Lignes effacées par chaque joueur
+    pieces_placed: List[int]  # Pièces posées par chaque joueur
+    game_over: bool  # False si la partie a été arrêtée par la limite de pièces
+    duration: float  # Durée de jeu en secondes
+
+
+class HostedSession:
+    """Une partie IA contre IA hébergée, réveillée par un seul minuteur de la boucle asyncio"""
+
+    def __init__(self, host: 'SessionHost', session_id: int, seed: int, randomizer: str = 'uniform',
+                 max_pieces: Optional[int] = None):
+        """Crée le moteur ; la partie commence avec start()"""
+        self.host = host
+        self.session_id = session_id
+        self.seed = seed
+        self.max_pieces = max_pieces
+
+        # Comme dans TetrisGame, l'horloge du moteur n'avance qu'au début de chaque réveil
+        self.clock = SimulatedClock(host.loop.time())
+        self.engine = Engine(clock=self.clock, seed=seed, fall_speed=host.fall_speed, randomizer=randomizer)
+        self.pilots = [AIPilot(index, host.move_delay, host.fall_delay) for index in range(len(self.engine.players))]
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.timer_target = 0.0
+        self.finished: asyncio.Future = host.loop.create_future()
+
+    def start(self) -> None:
+        """Commence la partie"""
+        self.wake()
+
+    def on_timer(self) -> None:
+        """Réveil programmé : mesure son retard puis fait avancer la partie"""
+        self.timer = None
+        self.host.record_lag(self.host.loop.time() - self.timer_target)
+        self.wake()
+
+    def wake(self) -> None:
+        """Fait avancer le moteur et les coups de l'IA, puis programme le prochain réveil"""
+        if self.finished.done():
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        self.clock.now = self.host.loop.time()
+        self.engine.tick()
+        for pilot in self.pilots:
+            pilot.step(self.engine)
+        for pilot in self.pilots:
+            if pilot.needs_move(self.engine):
+                self.request_move(pilot)
+
+        players = self.engine.players
+        if (self.engine.game.state == GameState.GAME_OVER or
+                (self.max_pieces is not None and max(player.pieces_placed for player in players) >= self.max_pieces)):
+            self.finish()
+            return
+
+        deadlines = [self.engine.next_deadline()] + [pilot.deadline(self.engine) for pilot in self.pilots]
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        if deadlines:
+            self.timer_target = min(deadlines)
+            self.timer = self.host.loop.call_at(self.timer_target, self.on_timer)
+
+    def request_move(self, pilot: AIPilot) -> None:
+        """Envoie un instantané au pool de l'IA pour la nouvelle pièce d'un joueur"""
+        player = pilot.request(self.engine)
+        budget = min(self.engine.remaining_fall_time(player) * self.host.think_share, self.host.max_think)
+        future = self.host.plan(AISnapshot.from_player(player, time_budget=budget,
+                                                       queue_length=self.host.queue_length))
+        future.add_done_callback(lambda done: self.on_command(pilot, done))
+
+    def on_command(self, pilot: AIPilot, future: asyncio.Future) -> None:
+        """Reçoit un coup de l'IA (dans la boucle asyncio) et réveille la partie"""
+        if self.finished.done() or future.cancelled():
+            return
+        if future.exception() is not None:
+            self.finished.set_exception(future.exception())
+            return
+        pilot.receive(self.engine, future.result())
+        self.wake()
+
+    def finish(self) -> None:
+        """Termine la partie et publie son résultat"""
+        players = self.engine.players
+        self.finished.set_result(SessionResult(
+            session_id=self.session_id,
+            seed=self.seed,
+            scores=[player.score for player in players],
+            lines_cleared=[player.lines_cleared for player in players],
+            pieces_placed=[player.pieces_placed for player in players],
+            game_over=self.engine.game.state == GameState.GAME_OVER,
+            duration=self.clock() - self.engine.game.start_time
+        ))
+
+
+class SessionHost:
+    """
+    Héberge des parties dans la boucle asyncio courante. Les coups de l'IA sont calculés
+    par workers processus partagés (avec workers=0, directement dans la boucle, ce qui
+    ne convient qu'à quelques parties)
+    """
+
+    def __init__(self, workers: int = 2, ai_options: Optional[dict] = None, fall_speed: float = 1.0,
+                 think_share: float = 0.5, max_think: float = 0.05,
+                 move_delay: float = 0.1, fall_delay: float = 0.05):
+        """
+        ai_options sont les paramètres de TetrisAI ; une réflexion dure au plus think_share
+        du temps de chute restant de la pièce, et jamais plus de max_think secondes pour
+        que le pool suive le rythme de toutes les parties
+        """
+        self.workers = workers
+        self.ai_options = ai_options if ai_options is not None else {'max_depth': 2}
+        self.queue_length = max(self.ai_options.get('max_depth', 3) - 2, 0)  # Pièces de la file utiles après la suivante
+        self.fall_speed = fall_speed
+        self.think_share = think_share
+        self.max_think = max_think
+        self.move_delay = move_delay
+        self.fall_delay = fall_delay
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.ai: Optional[TetrisAI] = None
+        self.sessions: List[HostedSession] = []
+
+        # Retard des réveils programmés, toutes parties confondues
+        self.wakeups = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        """Démarre le pool de l'IA (à appeler depuis la boucle asyncio)"""
+        self.loop = asyncio.get_running_loop()
+        if self.workers:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=init_process_ai, initargs=(self.ai_options,)
+            )
+        else:
+            self.ai = TetrisAI(**self.ai_options)
+
+    def close(self) -> None:
+        """Arrête les parties en cours et le pool de l'IA"""
+        for session in self.sessions:
+            if session.timer is not None:
+                session.timer.cancel()
+            if not session.finished.done():
+                session.finished.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+    def create_session(self, seed: int, randomizer: str = 'uniform', max_pieces: Optional[int] = None) -> HostedSession:
+        """Crée et démarre une partie"""
+        session = HostedSession(self, len(self.sessions), seed, randomizer, max_pieces)
+        self.sessions.append(session)
+        session.start()
+        return session
+
+    def plan(self, snapshot: AISnapshot) -> asyncio.Future:
+        """Demande un coup au pool de l'IA ; le résultat arrive dans la boucle asyncio"""
+        if self.executor is not None:
+            return self.loop.run_in_executor(self.executor, plan_packed, snapshot.pack())
+        future = self.loop.create_future()
+        future.set_result(plan_move(self.ai, snapshot))
+        return future
+
+    def record_lag(self, lag: float) -> None:
+        """Compte le retard d'un réveil programmé"""
+        self.wakeups += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+
+async def run_tournament(sessions: int, seed: int = 0, randomizer: str = 'uniform',
+                         max_pieces: Optional[int] = 100, **host_options) -> List[SessionResult]:
+    """Joue sessions parties simultanées (la partie i utilise la graine seed + i) et retourne leurs résultats"""
+    host = SessionHost(**host_options)
+    host.start()
+    try:
+        games = [host.create_session(seed + index, randomizer, max_pieces) for index in range(sessions)]
+        results = await asyncio.gather(*(game.finished for game in games))
+    finally:
+        host.close()
+
+    if host.wakeups:
+        print(f"Réveils : {host.wakeups}, retard moyen {host.total_lag / host.wakeups * 1000:.1f} ms, "
+              f"max {host.max_lag * 1000:.1f} ms", file=sys.stderr)
+    return results
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Parties Tetris IA contre IA simultanées dans un seul processus")
+    parser.add_argument('--sessions', type=int, default=200, help="nombre de parties simultanées")
+    parser.add_argument('--seed', type=int, default=0, help="graine de la première partie")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="processus de réflexion de l'IA (0 = dans la boucle)")
+    parser.add_argument('--max-pieces', type=int, default=100, help="pièces maximum par joueur")
+    parser.add_argument('--fall-speed', type=float, default=1.0, help="intervalle de chute en secondes")
+    parser.add_argument('--max-think', type=float, default=0.05, help="réflexion maximum de l'IA par pièce, en secondes")
+    parser.add_argument('--randomizer', choices=list(RANDOMIZERS), default='uniform', help="générateur des pièces")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = asyncio.run(run_tournament(
+        args.sessions, args.seed, args.randomizer, args.max_pieces,
+        workers=args.workers, fall_speed=args.fall_speed, max_think=args.max_think
+    ))
+    elapsed = time.perf_counter() - start
+
+    lines = [count for result in results for count in result.lines_cleared]
+    pieces = [count for result in results for count in result.pieces_placed]
+    print(f"Parties : {len(results)} en {elapsed:.1f}s")
+    print(f"Lignes moyennes : {statistics.mean(lines):.1f}")
+    print(f"Pièces moyennes : {statistics.mean(pieces):.1f}")
+    print(f"Parties terminées par un Game Over : {sum(result.game_over for result in results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mesures de latence des chemins critiques (boucle de jeu, affichage, décisions de l'IA),
+enregistrées dans des histogrammes à mémoire fixe.
+
+Désactivées par défaut : chaque point de mesure ne coûte alors qu'un test de enabled.
+Une fois activées, les percentiles sont disponibles à tout moment et peuvent être
+écrits dans un fichier JSON à la fin du programme.
+"""
+
+import atexit
+import json
+import math
+from typing import Dict, Optional
+
+# Interrupteur global, testé par les points de mesure avant de lire l'horloge
+enabled = False
+
+
+class Histogram:
+    """
+    Histogramme à mémoire fixe : les valeurs sont comptées dans des seaux de largeur
+    géométrique entre low et high (une erreur relative d'environ 6 % avec 20 seaux par
+    décade), plus un seau pour les valeurs trop petites et un pour les trop grandes
+    """
+
+    def __init__(self, name: str, unit: str = 's', low: float = 1e-6, high: float = 100.0,
+                 buckets_per_decade: int = 20):
+        """Crée un histogramme vide"""
+        self.name = name
+        self.unit = unit
+        self.low = low
+        self.scale = buckets_per_decade / math.log(10)
+        self.counts = [0] * (math.ceil(math.log(high / low) * self.scale) + 2)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """
+        Ajoute une valeur. Les enregistrements venant de plusieurs threads ne sont
+        pas verrouillés : un comptage peut exceptionnellement se perdre
+        """
+        if value <= self.low:
+            index = 0
+        else:
+            index = min(int(math.log(value / self.low) * self.scale) + 1, len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent: float) -> float:
+        """Retourne une estimation du percentile demandé (0 à 100), 0 si l'histogramme est vide"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+
+        # Milieu géométrique du seau, borné par les valeurs réellement observées
+        value = self.low * math.exp((index - 0.5) / self.scale) if index else self.low
+        return min(max(value, self.min), self.max)
+
+    def summary(self) -> Dict[str, float]:
+        """Retourne le nombre de valeurs, la moyenne, les extrêmes et les percentiles 50, 95 et 99"""
+        return {
+            'unit': self.unit,
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+    def reset(self) -> None:
+        """Oublie toutes les valeurs"""
+        self.counts = [0] * len(self.counts)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+
+# Histogrammes par nom
+HISTOGRAMS: Dict[str, Histogram] = {}
+
+
+def histogram(name: str, **options) -> Histogram:
+    """Retourne l'histogramme de ce nom, créé avec options (voir Histogram) s'il n'existe pas"""
+    if name not in HISTOGRAMS:
+        HISTOGRAMS[name] = Histogram(name, **options)
+    return HISTOGRAMS[name]
+
+
+# Points de mesure du jeu
+GAME_LOOP = histogram('game_loop')  # Durée d'un passage dans la boucle de jeu
+FRAME = histogram('update_display')  # Durée d'une mise à jour de l'affichage
+AI_DECISION = histogram('ai_decision')  # Latence d'une décision de l'IA
+AI_CANDIDATES = histogram('ai_candidates', unit='placements', low=1, high=1e7)  # Placements examinés par décision
+AFTER_LAG = histogram('after_lag')  # Retard des réveils programmés de la boucle de jeu
+
+class LiveStats:
+    """
+    Statistiques du jeu en cours pour la surcouche de débogage : les mesures sont
+    cumulées sur une fenêtre de window secondes, puis résumées en un texte qui ne
+    change qu'à la fin de chaque fenêtre
+    """
+
+    def __init__(self, window: float = 1.0):
+        """Commence sans mesure"""
+        self.window = window
+        self.text = "Mesures en cours..."
+
+        # Les décisions de l'IA, trop rares pour une fenêtre, sont comptées depuis le début
+        self.think_time = 0.0  # Réflexion de l'IA pour la dernière pièce
+        self.candidates = 0  # Placements examinés pour la dernière pièce
+        self.decisions = 0
+        self.cached = 0  # Décisions tirées du cache de l'IA
+        self.start_window(0.0)
+
+    def start_window(self, now: float) -> None:
+        """Commence une nouvelle fenêtre de mesure à l'instant now"""
+        self.window_start = now
+        self.frames = 0
+        self.frame_time = 0.0  # Durée cumulée des images de la fenêtre
+        self.max_frame_time = 0.0
+        self.lag = 0.0  # Retard cumulé des réveils programmés
+        self.max_lag = 0.0
+        self.wakeups = 0
+
+    def next_refresh(self) -> float:
+        """Retourne l'instant où le texte sera recalculé"""
+        return self.window_start + self.window
+
+    def record_frame(self, now: float, duration: float) -> None:
+        """Compte une image produite en duration secondes et recalcule le texte en fin de fenêtre"""
+        self.frames += 1
+        self.frame_time += duration
+        self.max_frame_time = max(self.max_frame_time, duration)
+        if now >= self.next_refresh():
+            self.text = self.describe(now)
+            self.start_window(now)
+
+    def record_lag(self, lag: float) -> None:
+        """Compte le retard d'un réveil programmé par rapport à l'instant demandé"""
+        self.wakeups += 1
+        self.lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    def record_decision(self, think_time: float, candidates: int) -> None:
+        """Compte une décision de l'IA (sans placement examiné, elle venait du cache)"""
+        self.think_time = think_time
+        self.candidates = candidates
+        self.decisions += 1
+        if not candidates:
+            self.cached += 1
+
+    def describe(self, now: float) -> str:
+        """Résume les mesures de la fenêtre qui se termine"""
+        elapsed = max(now - self.window_start, 1e-9)
+        frame = self.frame_time / self.frames if self.frames else 0.0
+        lag = self.lag / self.wakeups if self.wakeups else 0.0
+        speed = self.candidates / self.think_time if self.think_time else 0.0
+        hit_rate = self.cached / self.decisions if self.decisions else 0.0
+        return "\n".join([
+            f"Images/s : {self.frames / elapsed:.1f}",
+            f"Image : {frame * 1000:.2f} ms (max {self.max_frame_time * 1000:.2f})",
+            f"IA : {self.think_time * 1000:.1f} ms, {self.candidates} placements",
+            f"Placements/s : {speed:.0f}",
+            f"Cache IA : {hit_rate:.0%} ({self.cached}/{self.decisions})",
+            f"Retard after : {lag * 1000:.1f} ms (max {self.max_lag * 1000:.1f})",
+        ])
+
+
+_dump_path: Optional[str] = None
+
+
+def enable(dump_path: Optional[str] = None) -> None:
+    """Active les mesures ; avec dump_path, les percentiles y sont écrits à la fin du programme"""
+    global enabled, _dump_path
+    enabled = True
+    if dump_path is not None:
+        if _dump_path is None:
+            atexit.register(_dump_at_exit)
+        _dump_path = dump_path
+
+
+def disable() -> None:
+    """Désactive les mesures (les valeurs déjà enregistrées sont conservées)"""
+    global enabled
+    enabled = False
+
+
+def percentiles(name: str) -> Dict[str, float]:
+    """Retourne le résumé (percentiles 50, 95, 99...) d'un histogramme"""
+    return HISTOGRAMS[name].summary()
+
+
+def report() -> Dict[str, Dict[str, float]]:
+    """Retourne le résumé de tous les histogrammes"""
+    return {name: hist.summary() for name, hist in HISTOGRAMS.items()}
+
+
+def dump(path: str) -> None:
+    """Écrit le résumé de tous les histogrammes dans un fichier JSON"""
+    with open(path, 'w') as output:
+        json.dump(report(), output, indent=2)
+
+
+def reset() -> None:
+    """Vide tous les histogrammes"""
+    for hist in HISTOGRAMS.values():
+        hist.reset()
+
+
+def _dump_at_exit() -> None:
+    """Écrit les mesures à la fin du programme"""
+    if _dump_path is not None:
+        dump(_dump_path)
@@ -6,16 +6,42 @@ Tetris à deux joueurs (Humain vs IA)
 Développé avec Python et Tkinter
 """
 
+import argparse
 import tkinter as tk
 from game import TetrisGame
+from ai import EvaluationWeights
+import instrumentation
+from randomizer import RANDOMIZERS
 
 def main():
     """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Tetris à deux joueurs (Humain vs IA)")
+    parser.add_argument('--ai-process', action='store_true',
+                        help="faire réfléchir l'IA dans un processus séparé")
+    parser.add_argument('--seed', type=int, help="graine de la suite des pièces")
+    parser.add_argument('--record', help="fichier où enregistrer un replay de la partie")
+    parser.add_argument('--randomizer', choices=list(RANDOMIZERS), default='uniform',
+                        help="générateur des pièces : tirage uniforme, sac de 7 ou avec historique")
+    parser.add_argument('--weights', help="fichier JSON des poids d'évaluation de l'IA (produit par tuner.py)")
+    parser.add_argument('--instrument', metavar='FICHIER',
+                        help="mesurer les latences (boucle, affichage, IA) et écrire leurs percentiles dans ce fichier JSON à la fin")
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help="servir les compteurs d'exploitation (format Prometheus) sur http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--metrics-file', metavar='FICHIER',
+                        help="écrire régulièrement les compteurs d'exploitation dans ce fichier")
+    args = parser.parse_args()
+    
+    if args.instrument:
+        instrumentation.enable(args.instrument)
+    
     # Créer la fenêtre principale
     root = tk.Tk()
     
     # Créer le jeu
-    game = TetrisGame(root)
+    game = TetrisGame(root, ai_process=args.ai_process, seed=args.seed, record=args.record,
+                      randomizer=args.randomizer, metrics_port=args.metrics_port,
+                      metrics_file=args.metrics_file,
+                      weights=EvaluationWeights.load(args.weights) if args.weights else None)
     
     # Lancer la boucle principale
     root.mainloop()
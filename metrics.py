@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compteurs d'exploitation pour les bornes qui tournent longtemps, exposés au format
+texte de Prometheus sur un port HTTP local ou écrits périodiquement dans un fichier.
+
+Le moteur et la boucle de jeu ne font qu'incrémenter des compteurs en mémoire ;
+la mise en forme et les entrées-sorties se font dans un thread séparé, sans verrou :
+un export peut mélanger deux états successifs, mais la boucle de jeu n'attend jamais.
+"""
+
+import argparse
+import bisect
+import os
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, List
+
+# Étiquette de chaque joueur (0 = humain, 1 = IA)
+PLAYER_LABELS = ('human', 'ai')
+
+# Bornes des seaux de l'histogramme de latence des décisions de l'IA, en secondes
+AI_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class GameMetrics:
+    """Compteurs et jauges d'une borne, alimentés par le moteur (Engine.metrics) et la boucle de jeu"""
+
+    def __init__(self):
+        """Commence avec tous les compteurs à zéro"""
+        self.games_played = 0
+        self.game_overs = 0
+        self.tick_overruns = 0  # Réveils de la boucle de jeu en retard
+        self.pieces_placed = [0] * len(PLAYER_LABELS)
+        self.lines_cleared = [0] * len(PLAYER_LABELS)
+        self.scores = [0] * len(PLAYER_LABELS)  # Jauge : score de la partie en cours
+
+        # Histogramme de latence des décisions de l'IA (un seau de plus pour +Inf)
+        self.ai_latency_counts = [0] * (len(AI_LATENCY_BUCKETS) + 1)
+        self.ai_latency_sum = 0.0
+
+    def attach(self, engine) -> None:
+        """S'abonne aux événements du moteur (seules les parties commencées ensuite sont comptées)"""
+        engine.metrics = self
+
+    def game_started(self) -> None:
+        """Compte une nouvelle partie"""
+        self.games_played += 1
+        self.scores = [0] * len(PLAYER_LABELS)
+
+    def piece_placed(self, player_index: int, lines_cleared: int, score: int) -> None:
+        """Compte une pièce posée et les lignes qu'elle a effacées"""
+        self.pieces_placed[player_index] += 1
+        self.lines_cleared[player_index] += lines_cleared
+        self.scores[player_index] = score
+
+    def game_over(self) -> None:
+        """Compte une partie terminée par un Game Over"""
+        self.game_overs += 1
+
+    def tick_overrun(self) -> None:
+        """Compte un réveil de la boucle de jeu arrivé trop tard"""
+        self.tick_overruns += 1
+
+    def ai_decision(self, seconds: float) -> None:
+        """Ajoute la durée d'une décision de l'IA à l'histogramme"""
+        self.ai_latency_counts[bisect.bisect_left(AI_LATENCY_BUCKETS, seconds)] += 1
+        self.ai_latency_sum += seconds
+
+    def render(self) -> str:
+        """Met les compteurs au format texte de Prometheus"""
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels)
+                lines.append(f"{name}{suffix}{{{label_text}}} {value}" if labels else f"{name}{suffix} {value}")
+
+        def per_player(values: List[int]) -> List[tuple]:
+            return [('', (('player', label),), value) for label, value in zip(PLAYER_LABELS, values)]
+
+        metric('tetris_games_played_total', 'counter', "Parties commencées", [('', (), self.games_played)])
+        metric('tetris_game_overs_total', 'counter', "Parties terminées par un Game Over", [('', (), self.game_overs)])
+        metric('tetris_tick_overruns_total', 'counter', "Réveils de la boucle de jeu en retard",
+               [('', (), self.tick_overruns)])
+        metric('tetris_pieces_placed_total', 'counter', "Pièces posées", per_player(list(self.pieces_placed)))
+        metric('tetris_lines_cleared_total', 'counter', "Lignes effacées", per_player(list(self.lines_cleared)))
+        metric('tetris_score', 'gauge', "Score de la partie en cours", per_player(list(self.scores)))
+
+        # Histogramme : seaux cumulés, puis somme et nombre de décisions
+        counts = list(self.ai_latency_counts)
+        samples = []
+        cumulative = 0
+        for bound, count in zip(AI_LATENCY_BUCKETS + ('+Inf',), counts):
+            cumulative += count
+            samples.append(('_bucket', (('le', bound),), cumulative))
+        samples.append(('_sum', (), self.ai_latency_sum))
+        samples.append(('_count', (), cumulative))
+        metric('tetris_ai_decision_seconds', 'histogram', "Durée des décisions de l'IA", samples)
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Sert les compteurs sur http://host:port/metrics depuis un thread séparé"""
+
+    def __init__(self, metrics: GameMetrics, port: int = 9464, host: str = '127.0.0.1'):
+        """Ouvre le port tout de suite (une erreur s'il est déjà pris), sans encore servir"""
+        self.metrics = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            """Répond aux requêtes du collecteur"""
+
+            def do_GET(self):
+                """Renvoie les compteurs sur /metrics, une erreur 404 ailleurs"""
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                """Pas de journal sur la sortie d'erreur à chaque collecte"""
+
+        self.server = HTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        """Port réellement ouvert (utile avec le port 0)"""
+        return self.server.server_address[1]
+
+    def start(self) -> None:
+        """Commence à servir"""
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Arrête de servir et ferme le port"""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MetricsFileWriter:
+    """
+    Écrit les compteurs dans un fichier toutes les interval secondes depuis un thread
+    séparé (par exemple pour le collecteur de fichiers texte de node_exporter)
+    """
+
+    def __init__(self, metrics: GameMetrics, path: str, interval: float = 15.0):
+        """Prépare l'écriture, sans encore la démarrer"""
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        """Démarre les écritures périodiques"""
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Arrête les écritures après une dernière mise à jour du fichier"""
+        self.stopped.set()
+        self.thread.join()
+
+    def write(self) -> None:
+        """Écrit un fichier temporaire puis le renomme : un lecteur ne voit jamais de fichier partiel"""
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as output:
+            output.write(self.metrics.render())
+        os.replace(temporary, self.path)
+
+    def _run(self) -> None:
+        """Boucle du thread : une écriture par intervalle, et une dernière à l'arrêt"""
+        while not self.stopped.wait(self.interval):
+            self.write()
+        self.write()
+
+
+def parse_metrics(text: str) -> Dict[str, float]:
+    """Décode le format texte de Prometheus : nom avec étiquettes -> valeur (commentaires ignorés)"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def scrape(url: str, timeout: float = 5.0) -> Dict[str, float]:
+    """Collecte les compteurs d'un serveur, comme le ferait Prometheus"""
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return parse_metrics(response.read().decode('utf-8'))
+
+
+def main():
+    """Collecteur minimal en ligne de commande, pour vérifier une borne sans Prometheus"""
+    parser = argparse.ArgumentParser(description="Affiche les compteurs exposés par main.py --metrics-port")
+    parser.add_argument('url', nargs='?', default='http://127.0.0.1:9464/metrics', help="adresse des compteurs")
+    args = parser.parse_args()
+
+    for name, value in scrape(args.url).items():
+        print(f"{name} {value:g}")
+
+
+if __name__ == "__main__":
+    main()
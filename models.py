@@ -6,25 +6,32 @@ Classes de données pour le jeu Tetris à deux joueurs
 """
 
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Tuple, Dict, Optional, Set, Callable
 from constants import PlayerType, GameState
+from board import Board
+from randomizer import PieceQueue
 
 @dataclass
 class Player:
     """Classe représentant un joueur"""
     type: PlayerType
-    grid: List[List[str]]  # Grille contenant les pièces placées
+    grid: Board  # Grille contenant les pièces placées
     score: int = 0
     current_piece: Optional[str] = None  # Type de la pièce actuelle
+    piece_id: int = 0  # Numéro de la pièce actuelle, jamais réutilisé (même après un redémarrage)
     current_rotation: int = 0  # Rotation actuelle de la pièce
     current_position: Tuple[int, int] = (0, 0)  # Position (ligne, colonne) de la pièce actuelle
     next_piece: Optional[str] = None  # Type de la prochaine pièce
+    piece_queue: Optional[PieceQueue] = None  # Pièces standard à venir après la prochaine
     lines_cleared: int = 0  # Nombre total de lignes complétées
+    pieces_placed: int = 0  # Nombre de pièces posées dans la grille
     speed_modifier: float = 1.0  # Modificateur de vitesse (< 1.0 = plus lent)
     speed_modifier_end_time: float = 0  # Temps de fin de l'effet de vitesse
+    fall_accumulator: float = 0  # Temps écoulé depuis la dernière chute de la pièce
     rainbow_end_time: float = 0  # Temps de fin de l'effet arc-en-ciel
     gift_next_piece: bool = False  # Indique si le joueur doit recevoir une pièce facile
+    dirty_cells: Set[Tuple[int, int]] = field(default_factory=set)  # Cellules (ligne, colonne) à redessiner
 
 @dataclass
 class GameSession:
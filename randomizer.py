@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Générateurs de la suite des pièces standard et file d'attente des pièces à venir
+"""
+
+import random
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, List
+
+from constants import STANDARD_TETROMINOS
+
+
+class Randomizer(ABC):
+    """Génère une suite de pièces standard à partir d'un générateur aléatoire"""
+
+    def __init__(self, rng: random.Random):
+        """rng est propre au générateur : deux générateurs de même graine donnent la même suite"""
+        self.rng = rng
+
+    @abstractmethod
+    def next_piece(self) -> str:
+        """Retourne la pièce suivante de la suite"""
+
+    def generate(self, count: int) -> List[str]:
+        """Retourne les count pièces suivantes d'un coup"""
+        return [self.next_piece() for _ in range(count)]
+
+
+class UniformRandomizer(Randomizer):
+    """Chaque pièce est tirée indépendamment des précédentes (règle d'origine du jeu)"""
+
+    def next_piece(self) -> str:
+        """Tire une pièce standard au hasard"""
+        return self.rng.choice(STANDARD_TETROMINOS)
+
+    def generate(self, count: int) -> List[str]:
+        """Tire count pièces en un seul appel"""
+        return self.rng.choices(STANDARD_TETROMINOS, k=count)
+
+
+class BagRandomizer(Randomizer):
+    """
+    Sac de 7 : les 7 pièces standard sont distribuées dans un ordre aléatoire,
+    puis un nouveau sac est mélangé. Jamais plus de 12 pièces entre deux barres.
+    """
+
+    def __init__(self, rng: random.Random):
+        """Commence avec un sac vide"""
+        super().__init__(rng)
+        self.bag: List[str] = []
+
+    def next_piece(self) -> str:
+        """Retourne la pièce suivante du sac, en mélangeant un nouveau sac si besoin"""
+        if not self.bag:
+            self.bag = list(STANDARD_TETROMINOS)
+            self.rng.shuffle(self.bag)
+        return self.bag.pop()
+
+
+class HistoryRandomizer(Randomizer):
+    """
+    Tirage avec historique : une pièce présente parmi les dernières pièces données
+    est retirée au sort jusqu'à rolls fois, ce qui évite les répétitions sans rendre
+    la suite prévisible. La première pièce n'est jamais un S, un Z ou un O.
+    """
+
+    def __init__(self, rng: random.Random, history_size: int = 4, rolls: int = 6):
+        """L'historique commence rempli de S et de Z, comme dans les jeux d'arcade"""
+        if rolls < 1:
+            raise ValueError(f"Il faut au moins un tirage par pièce : {rolls}")
+        super().__init__(rng)
+        self.rolls = rolls
+        self.history: Deque[str] = deque(['Z', 'S', 'Z', 'S'][:history_size], maxlen=history_size)
+        self.first = True
+
+    def next_piece(self) -> str:
+        """Tire une pièce en évitant celles de l'historique"""
+        if self.first:
+            self.first = False
+            piece = self.rng.choice(['I', 'J', 'L', 'T'])
+        else:
+            for _ in range(self.rolls):
+                piece = self.rng.choice(STANDARD_TETROMINOS)
+                if piece not in self.history:
+                    break
+        self.history.append(piece)
+        return piece
+
+
+# Générateurs disponibles, par nom (l'ordre fait partie du format des replays)
+RANDOMIZERS = {
+    'uniform': UniformRandomizer,
+    'bag': BagRandomizer,
+    'history': HistoryRandomizer,
+}
+
+
+class PieceQueue:
+    """
+    File des pièces à venir d'un joueur, générées par lots à l'avance :
+    les size prochaines pièces sont toujours connues, sans tirage au moment de jouer
+    """
+
+    def __init__(self, randomizer: Randomizer, size: int = 5):
+        """Remplit la file dès sa création"""
+        self.randomizer = randomizer
+        self.size = size
+        self.pieces: Deque[str] = deque()
+        self.fill()
+
+    def fill(self) -> None:
+        """
+        Complète la file par un lot de pièces quand elle passe sous sa taille
+        (au moins une pièce reste disponible, même avec une taille nulle)
+        """
+        batch = max(self.size, 1)
+        if len(self.pieces) < batch:
+            self.pieces.extend(self.randomizer.generate(batch * 2))
+
+    def pop(self) -> str:
+        """Retire et retourne la prochaine pièce"""
+        piece = self.pieces.popleft()
+        self.fill()
+        return piece
+
+    def peek(self, count: int) -> List[str]:
+        """Retourne les count prochaines pièces sans les retirer"""
+        return list(self.pieces)[:count]
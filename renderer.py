@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Affichage en mode retenu du jeu Tetris à deux joueurs
+"""
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+from constants import (
+    GRID_WIDTH, GRID_HEIGHT, BLOCK_SIZE, GRID_BORDER, GRID_PADDING,
+    SCOREBOARD_HEIGHT, SCOREBOARD_PADDING, PREVIEW_SIZE,
+    COLORS, SHAPES, GameState
+)
+from engine import ALL_CELLS
+
+
+class PlayerView:
+    """Éléments du canevas appartenant à un joueur (grille, prévisualisation, effets)"""
+
+    def __init__(self, player, grid_x: int, grid_y: int, preview_x: int, preview_y: int):
+        """Mémorise la position des éléments d'un joueur"""
+        self.player = player
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self.preview_x = preview_x
+        self.preview_y = preview_y
+
+        # Identifiants des éléments, créés par Renderer
+        self.cells: List[List[int]] = []
+        self.preview_background = 0
+        self.preview_cells: List[List[int]] = []
+        self.preview_label = 0
+        self.slow_text = 0
+        self.rainbow_text = 0
+        self.gift_text = 0
+
+
+class Renderer:
+    """
+    Dessine le jeu en mode retenu : toutes les cellules et tous les textes sont créés
+    une seule fois, puis chaque image ne redessine que les cellules marquées par le moteur
+    (Player.dirty_cells) et les textes signalés par Engine.hud_dirty
+    """
+
+    def __init__(self, canvas, engine, window_width: int, rng: Optional[random.Random] = None):
+        """
+        Calcule la disposition et crée tous les éléments du canevas. L'effet arc-en-ciel
+        tire ses couleurs de rng, indépendant du hasard du moteur pour ne pas changer les pièces.
+        """
+        self.canvas = canvas
+        self.engine = engine
+        self.rng = rng if rng is not None else random.Random()
+        self.rainbow_colors = list(COLORS.values())[:7]  # Utiliser uniquement les couleurs des pièces standards
+
+        # Dernière configuration appliquée à chaque élément (couleur ou texte)
+        self.applied: Dict[int, str] = {}
+
+        # Effets affichés à l'image précédente (leur fin impose un dernier redessin)
+        self.rainbow_drawn = False
+        self.effects_drawn = False
+
+        # Calculer les positions des grilles avec plus d'espace entre elles
+        human_grid_x = GRID_PADDING * 2
+        human_grid_y = GRID_PADDING
+        ai_grid_x = window_width - GRID_PADDING * 2 - (GRID_WIDTH * BLOCK_SIZE + GRID_BORDER * 2)
+        ai_grid_y = GRID_PADDING
+
+        # Prévisualisation du joueur humain à droite de sa grille, celle de l'IA à gauche de la sienne
+        self.views = [
+            PlayerView(
+                engine.human_player, human_grid_x, human_grid_y,
+                human_grid_x + (GRID_WIDTH * BLOCK_SIZE + GRID_BORDER * 2) + 20, human_grid_y + 50
+            ),
+            PlayerView(
+                engine.ai_player, ai_grid_x, ai_grid_y,
+                ai_grid_x - (PREVIEW_SIZE * BLOCK_SIZE) - 20, ai_grid_y + 50
+            ),
+        ]
+
+        # Positionner le tableau des scores sous les grilles
+        self.scoreboard_x = window_width / 2 - ((GRID_WIDTH * BLOCK_SIZE + GRID_BORDER * 2) * 2 + GRID_PADDING) / 2
+        self.scoreboard_y = human_grid_y + GRID_HEIGHT * BLOCK_SIZE + GRID_BORDER * 2 + SCOREBOARD_PADDING
+
+        for view in self.views:
+            self.create_grid(view)
+            self.create_preview(view)
+        self.create_scoreboard()
+        self.create_special_effects()
+        self.create_debug_overlay(window_width)
+
+    def create_grid(self, view: PlayerView) -> None:
+        """Crée le fond de la grille et ses cellules (cachées tant qu'elles sont vides)"""
+        self.canvas.create_rectangle(
+            view.grid_x - GRID_BORDER,
+            view.grid_y - GRID_BORDER,
+            view.grid_x + GRID_WIDTH * BLOCK_SIZE + GRID_BORDER,
+            view.grid_y + GRID_HEIGHT * BLOCK_SIZE + GRID_BORDER,
+            fill=COLORS['GRID'],
+            outline=COLORS['BORDER'],
+            width=GRID_BORDER
+        )
+
+        view.cells = [
+            [self.create_cell(view.grid_x + col * BLOCK_SIZE, view.grid_y + row * BLOCK_SIZE) for col in range(GRID_WIDTH)]
+            for row in range(GRID_HEIGHT)
+        ]
+
+    def create_preview(self, view: PlayerView) -> None:
+        """Crée le cadre de prévisualisation, ses cellules et le nom de la pièce"""
+        preview_width = PREVIEW_SIZE * BLOCK_SIZE
+        preview_height = PREVIEW_SIZE * BLOCK_SIZE
+        view.preview_background = self.canvas.create_rectangle(
+            view.preview_x, view.preview_y,
+            view.preview_x + preview_width, view.preview_y + preview_height,
+            fill=COLORS['GRID'], outline=COLORS['BORDER'], state='hidden'
+        )
+        self.applied[view.preview_background] = ''
+
+        view.preview_cells = [
+            [self.create_cell(view.preview_x + col * BLOCK_SIZE, view.preview_y + row * BLOCK_SIZE) for col in range(PREVIEW_SIZE)]
+            for row in range(PREVIEW_SIZE)
+        ]
+
+        view.preview_label = self.create_text(
+            view.preview_x + preview_width // 2,
+            view.preview_y + preview_height + 20,
+            ('Helvetica', 12)
+        )
+
+    def create_scoreboard(self) -> None:
+        """Crée le fond et les textes du tableau des scores"""
+        self.canvas.create_rectangle(
+            self.scoreboard_x,
+            self.scoreboard_y,
+            self.scoreboard_x + (GRID_WIDTH * BLOCK_SIZE + GRID_BORDER * 2) * 2 + GRID_PADDING,
+            self.scoreboard_y + SCOREBOARD_HEIGHT,
+            fill=COLORS['SCOREBOARD'],
+            outline=COLORS['BORDER']
+        )
+
+        # Colonnes du joueur humain et de l'IA
+        self.score_texts: List[Tuple[int, int]] = []
+        for column_x, title in (
+            (self.scoreboard_x + (GRID_WIDTH * BLOCK_SIZE + GRID_BORDER * 2) // 2, "JOUEUR HUMAIN"),
+            (self.scoreboard_x + (GRID_WIDTH * BLOCK_SIZE + GRID_BORDER * 2) * 3 // 2 + GRID_PADDING, "JOUEUR IA"),
+        ):
+            self.canvas.create_text(
+                column_x,
+                self.scoreboard_y + SCOREBOARD_HEIGHT // 4,
+                text=title,
+                fill=COLORS['TEXT'],
+                font=('Helvetica', 16, 'bold')
+            )
+            self.score_texts.append((
+                self.create_text(column_x, self.scoreboard_y + SCOREBOARD_HEIGHT // 2, ('Helvetica', 14)),
+                self.create_text(column_x, self.scoreboard_y + 3 * SCOREBOARD_HEIGHT // 4, ('Helvetica', 14)),
+            ))
+
+        # Afficher l'état du jeu
+        self.state_text = self.create_text(
+            self.scoreboard_x + (GRID_WIDTH * BLOCK_SIZE + GRID_BORDER * 2) + GRID_PADDING // 2,
+            self.scoreboard_y + SCOREBOARD_HEIGHT // 2,
+            ('Helvetica', 18, 'bold'),
+            fill='#FF0000'
+        )
+
+    def create_special_effects(self) -> None:
+        """Crée les textes des effets spéciaux (vides tant que l'effet est inactif)"""
+        for view in self.views:
+            center_x = view.grid_x + (GRID_WIDTH * BLOCK_SIZE) // 2
+            view.slow_text = self.create_text(center_x, view.grid_y - 20, ('Helvetica', 12, 'bold'), fill='#00FFFF')
+            view.rainbow_text = self.create_text(center_x, view.grid_y - 40, ('Helvetica', 12, 'bold'), fill='#FF00FF')
+            view.gift_text = self.create_text(center_x, view.grid_y - 60, ('Helvetica', 12, 'bold'), fill='#FFFF00')
+
+        self.gentle_pause_text = self.create_text(
+            self.scoreboard_x + (GRID_WIDTH * BLOCK_SIZE + GRID_BORDER * 2) + GRID_PADDING // 2,
+            self.scoreboard_y - 20,
+            ('Helvetica', 14, 'bold'),
+            fill='#FFA500'
+        )
+
+    def create_debug_overlay(self, window_width: int) -> None:
+        """Crée le texte de la surcouche de débogage, entre les deux grilles sous les prévisualisations"""
+        self.debug_text = self.canvas.create_text(
+            window_width // 2, self.views[0].preview_y + PREVIEW_SIZE * BLOCK_SIZE + 60,
+            text='', fill='#00FF00', font=('Courier', 10), anchor='n', justify='left'
+        )
+        self.applied[self.debug_text] = ''
+
+    def create_cell(self, x: int, y: int) -> int:
+        """Crée une cellule cachée"""
+        item = self.canvas.create_rectangle(
+            x, y, x + BLOCK_SIZE, y + BLOCK_SIZE,
+            fill=COLORS['EMPTY'], outline='#444444', state='hidden'
+        )
+        self.applied[item] = ''
+        return item
+
+    def create_text(self, x: int, y: int, font: tuple, fill: str = COLORS['TEXT']) -> int:
+        """Crée un texte vide"""
+        item = self.canvas.create_text(x, y, text='', fill=fill, font=font)
+        self.applied[item] = ''
+        return item
+
+    def set_fill(self, item: int, color: str) -> None:
+        """Colore une cellule (ou la cache si color est vide), seulement si elle change"""
+        if self.applied[item] == color:
+            return
+
+        self.applied[item] = color
+        if color:
+            self.canvas.itemconfig(item, fill=color, state='normal')
+        else:
+            self.canvas.itemconfig(item, state='hidden')
+
+    def set_text(self, item: int, text: str) -> None:
+        """Change un texte seulement s'il est différent"""
+        if self.applied[item] == text:
+            return
+
+        self.applied[item] = text
+        self.canvas.itemconfig(item, text=text)
+
+    def cell_color(self, color: str) -> str:
+        """Applique l'effet arc-en-ciel à une couleur de cellule"""
+        if color and self.engine.rainbow_mode:
+            # Utiliser une couleur aléatoire parmi les 7 couleurs standard
+            return self.rng.choice(self.rainbow_colors)
+        return color
+
+    def render(self) -> None:
+        """
+        Met à jour les éléments qui ont changé depuis l'image précédente ; une image
+        sans changement (jeu inactif, en pause ou terminé) ne touche pas au canevas
+        """
+        # L'effet arc-en-ciel recolore toutes les cellules à chaque image, et sa fin
+        # impose un redessin complet avec les vraies couleurs
+        rainbow = self.engine.rainbow_mode
+        full = rainbow or self.rainbow_drawn
+        self.rainbow_drawn = rainbow
+
+        hud = self.engine.hud_dirty or full
+        self.engine.hud_dirty = False
+
+        for view in self.views:
+            self.update_grid(view, full)
+            if hud:
+                self.update_preview(view)
+        if hud:
+            self.update_scoreboard()
+
+        # Les comptes à rebours des effets changent avec le temps
+        effects = self.effects_active()
+        if hud or effects or self.effects_drawn:
+            self.update_special_effects()
+        self.effects_drawn = effects
+
+    def update_debug_overlay(self, text: str) -> None:
+        """Affiche les mesures de performance (un texte vide cache la surcouche)"""
+        self.set_text(self.debug_text, text)
+
+    def effects_active(self) -> bool:
+        """Indique si un effet avec compte à rebours est affiché"""
+        current_time = self.engine.clock()
+        return any(
+            view.player.speed_modifier < 1.0 and current_time < view.player.speed_modifier_end_time
+            for view in self.views
+        )
+
+    def next_deadline(self) -> Optional[float]:
+        """Retourne l'instant où un compte à rebours affiché change de valeur, ou None"""
+        current_time = self.engine.clock()
+        deadlines = [
+            current_time + ((view.player.speed_modifier_end_time - current_time) % 1.0 or 1.0)
+            for view in self.views
+            if view.player.speed_modifier < 1.0 and current_time < view.player.speed_modifier_end_time
+        ]
+        return min(deadlines) if deadlines else None
+
+    def update_grid(self, view: PlayerView, full: bool = False) -> None:
+        """Met à jour les cellules marquées de la grille (ou toutes si full est vrai)"""
+        player = view.player
+
+        # Consommer les cellules marquées (le moteur ne change que dans le thread de Tk,
+        # les coups de l'IA y étant appliqués par AIPilot)
+        dirty = list(player.dirty_cells)
+        player.dirty_cells.clear()
+        cells = ALL_CELLS if full else dirty
+        if not cells:
+            return
+
+        # Cellules occupées par la pièce actuelle
+        piece_cells = {}
+        if player.current_piece:
+            row_offset, col_offset = player.current_position
+            for row, col in self.engine.get_piece_coordinates(player):
+                piece_cells[(row + row_offset, col + col_offset)] = COLORS[player.current_piece]
+
+        colors = player.grid.colors
+        for row, col in cells:
+            color = piece_cells.get((row, col)) or colors[row][col]
+            self.set_fill(view.cells[row][col], self.cell_color(color))
+
+    def update_preview(self, view: PlayerView) -> None:
+        """Met à jour la prévisualisation de la prochaine pièce"""
+        next_piece = view.player.next_piece
+        preview_blocks = {}
+        if next_piece:
+            # Centrer la première rotation de la pièce dans la prévisualisation
+            shape = SHAPES[next_piece][0]
+            min_row = min(row for row, _ in shape)
+            max_row = max(row for row, _ in shape)
+            min_col = min(col for _, col in shape)
+            max_col = max(col for _, col in shape)
+            row_offset = (PREVIEW_SIZE - (max_row - min_row + 1)) // 2
+            col_offset = (PREVIEW_SIZE - (max_col - min_col + 1)) // 2
+            for row, col in shape:
+                preview_blocks[(row - min_row + row_offset, col - min_col + col_offset)] = COLORS[next_piece]
+
+        self.set_fill(view.preview_background, COLORS['GRID'] if next_piece else '')
+        for row in range(PREVIEW_SIZE):
+            for col in range(PREVIEW_SIZE):
+                self.set_fill(view.preview_cells[row][col], self.cell_color(preview_blocks.get((row, col), '')))
+
+        # Afficher le nom de la pièce
+        self.set_text(view.preview_label, next_piece or '')
+
+    def update_scoreboard(self) -> None:
+        """Met à jour les scores et l'état du jeu"""
+        for view, (score_text, lines_text) in zip(self.views, self.score_texts):
+            self.set_text(score_text, f"Score: {view.player.score}")
+            self.set_text(lines_text, f"Lignes: {view.player.lines_cleared}")
+
+        state = self.engine.game.state
+        if state == GameState.PAUSED:
+            self.set_text(self.state_text, "PAUSE")
+        elif state == GameState.GAME_OVER:
+            self.set_text(self.state_text, "GAME OVER")
+        else:
+            self.set_text(self.state_text, '')
+
+    def update_special_effects(self) -> None:
+        """Met à jour les textes des effets spéciaux"""
+        current_time = self.engine.clock()
+
+        # Effet de ralentissement de chaque joueur
+        slowed = []
+        for view in self.views:
+            player = view.player
+            if player.speed_modifier < 1.0 and current_time < player.speed_modifier_end_time:
+                remaining = int(player.speed_modifier_end_time - current_time)
+                self.set_text(view.slow_text, f"Ralenti pendant {remaining}s")
+                slowed.append(player)
+            else:
+                self.set_text(view.slow_text, '')
+
+            # Effet arc-en-ciel et indicateur de cadeau surprise
+            self.set_text(view.rainbow_text, "MODE ARC-EN-CIEL !" if self.engine.rainbow_mode else '')
+            self.set_text(view.gift_text, "CADEAU SURPRISE !" if player.gift_next_piece else '')
+
+        # Pause douceur : les deux joueurs sont ralentis en même temps
+        if len(slowed) == len(self.views):
+            remaining = int(min(player.speed_modifier_end_time for player in slowed) - current_time)
+            self.set_text(self.gentle_pause_text, f"PAUSE DOUCEUR! ({remaining}s)")
+        else:
+            self.set_text(self.gentle_pause_text, '')
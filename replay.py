@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Enregistrement et relecture des parties dans un format binaire compact.
+
+Un replay contient la configuration du moteur (graine, instant de départ, vitesse
+de chute, générateur de pièces), puis, dans l'ordre, chaque tick, chaque action des
+joueurs, chaque coup reçu de l'IA et chaque pièce apparue. Comme le moteur est déterministe (horloge et hasard injectés),
+rejouer les ticks et les actions aux mêmes instants reproduit exactement la partie ;
+les pièces enregistrées servent à vérifier qu'elle n'a pas divergé.
+"""
+
+import argparse
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import BinaryIO, List, Tuple
+
+from constants import Action, PIECE_NAMES, PIECE_CODES
+from engine import Engine, SimulatedClock
+from randomizer import RANDOMIZERS
+
+MAGIC = b'TTRP'
+VERSION = 2
+
+# En-tête : signature, version, graine, instant de départ, vitesse de chute,
+# générateur de pièces et taille de la file des pièces à venir
+HEADER = struct.Struct('<4sBQddBB')
+RANDOMIZER_NAMES = list(RANDOMIZERS)
+
+# Types d'événements, suivis chacun de leurs données
+TICK = 1  # instant
+ACTION = 2  # instant, joueur, action
+COMMAND = 3  # instant, pièce, rotation, colonne (coup choisi par l'IA)
+PIECE = 4  # joueur, type de pièce
+
+EVENTS = {
+    TICK: struct.Struct('<d'),
+    ACTION: struct.Struct('<dBB'),
+    COMMAND: struct.Struct('<dIBB'),
+    PIECE: struct.Struct('<BB'),
+}
+
+
+@dataclass
+class Replay:
+    """Contenu d'un replay décodé"""
+    seed: int
+    start_time: float
+    fall_speed: float
+    randomizer: str
+    queue_size: int
+    events: List[Tuple] = field(default_factory=list)  # (type, données...)
+
+    def pieces(self) -> List[Tuple[int, str]]:
+        """Retourne la suite des pièces apparues : (joueur, type de pièce)"""
+        return [(event[1], PIECE_NAMES[event[2]]) for event in self.events if event[0] == PIECE]
+
+
+class ReplayRecorder:
+    """
+    Enregistre une partie au fil de l'eau. Il doit être créé juste après le moteur,
+    avant le premier tick ou la première action.
+    """
+
+    def __init__(self, stream: BinaryIO, engine: Engine):
+        """Écrit l'en-tête et s'abonne aux événements du moteur"""
+        self.stream = stream
+        stream.write(HEADER.pack(
+            MAGIC, VERSION, engine.seed, engine.game.start_time, engine.fall_speed,
+            RANDOMIZER_NAMES.index(engine.randomizer), engine.queue_size
+        ))
+
+        # Les premières pièces sont apparues à la création du moteur
+        for player in engine.players:
+            self.record_piece(engine.player_index(player), player.current_piece)
+        engine.recorder = self
+
+    def write(self, kind: int, *values) -> None:
+        """Écrit un événement"""
+        self.stream.write(bytes((kind,)) + EVENTS[kind].pack(*values))
+
+    def record_tick(self, current_time: float) -> None:
+        """Enregistre un tick du moteur"""
+        self.write(TICK, current_time)
+
+    def record_action(self, current_time: float, player_index: int, action: Action) -> None:
+        """Enregistre une action d'un joueur"""
+        self.write(ACTION, current_time, player_index, action.value)
+
+    def record_command(self, current_time: float, command) -> None:
+        """Enregistre le coup (AICommand) reçu de l'IA, pour le diagnostic"""
+        self.write(COMMAND, current_time, command.piece_id, command.rotation, command.column)
+
+    def record_piece(self, player_index: int, piece: str) -> None:
+        """Enregistre l'apparition d'une pièce"""
+        self.write(PIECE, player_index, PIECE_CODES[piece])
+
+    def close(self) -> None:
+        """Termine l'enregistrement"""
+        self.stream.close()
+
+
+def read_replay(stream: BinaryIO) -> Replay:
+    """Décode un replay"""
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError("Replay tronqué : en-tête incomplet")
+    magic, version, seed, start_time, fall_speed, randomizer, queue_size = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Format de replay non reconnu : {magic!r} version {version}")
+
+    replay = Replay(
+        seed=seed, start_time=start_time, fall_speed=fall_speed,
+        randomizer=RANDOMIZER_NAMES[randomizer], queue_size=queue_size
+    )
+    while True:
+        kind = stream.read(1)
+        if not kind:
+            return replay
+        event = EVENTS.get(kind[0])
+        if event is None:
+            raise ValueError(f"Événement de replay inconnu : {kind[0]}")
+        data = stream.read(event.size)
+        if len(data) < event.size:
+            # Enregistrement interrompu (par exemple par un plantage) : garder le début
+            return replay
+        replay.events.append((kind[0],) + event.unpack(data))
+
+
+def load_replay(path: str) -> Replay:
+    """Lit un replay depuis un fichier"""
+    with open(path, 'rb') as stream:
+        return read_replay(stream)
+
+
+def play_replay(replay: Replay, verify: bool = True) -> Engine:
+    """
+    Rejoue une partie sans interface, aussi vite que possible, et retourne le moteur
+    dans son état final. Avec verify, vérifie que les pièces apparues sont les mêmes.
+    """
+    clock = SimulatedClock(replay.start_time)
+    engine = Engine(
+        clock=clock, seed=replay.seed, fall_speed=replay.fall_speed,
+        randomizer=replay.randomizer, queue_size=replay.queue_size
+    )
+
+    # Réenregistrer la partie rejouée pour comparer ses pièces à celles du replay
+    replayed = BytesIO()
+    ReplayRecorder(replayed, engine)
+
+    for kind, *values in replay.events:
+        if kind == TICK:
+            clock.now = values[0]
+            engine.tick()
+        elif kind == ACTION:
+            clock.now = values[0]
+            engine.apply_action(values[1], Action(values[2]))
+
+    if verify:
+        expected = replay.pieces()
+        actual = read_replay(BytesIO(replayed.getvalue())).pieces()
+        for index, (wanted, got) in enumerate(zip(expected, actual)):
+            if wanted != got:
+                raise ValueError(f"Le replay a divergé à la pièce {index} : {got} au lieu de {wanted}")
+        if len(expected) != len(actual):
+            raise ValueError(f"Le replay a divergé : {len(actual)} pièces au lieu de {len(expected)}")
+
+    return engine
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Relecture rapide d'un replay Tetris sans interface")
+    parser.add_argument('replay', help="fichier enregistré avec main.py --record")
+    parser.add_argument('--no-verify', action='store_true', help="ne pas vérifier la suite des pièces")
+    args = parser.parse_args()
+
+    replay = load_replay(args.replay)
+    start = time.perf_counter()
+    try:
+        engine = play_replay(replay, verify=not args.no_verify)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    duration = engine.clock() - replay.start_time
+    print(f"Graine {replay.seed} : {len(replay.events)} événements, {duration:.1f}s de jeu rejouées en {elapsed:.3f}s")
+    for name, player in zip(("Humain", "IA"), engine.players):
+        print(f"{name} : score {player.score}, lignes {player.lines_cleared}, pièces {player.pieces_placed}")
+    print(f"État final : {engine.game.state.name}")
+
+
+if __name__ == "__main__":
+    main()
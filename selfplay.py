@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Parties IA contre IA sans interface, réparties sur tous les cœurs
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from typing import Iterator, List, Optional
+
+from constants import GameState
+from engine import Engine, SimulatedClock
+from ai import TetrisAI, EvaluationWeights
+from randomizer import RANDOMIZERS
+
+
+@dataclass
+class GameResult:
+    """Résultat d'une partie IA contre IA"""
+    seed: int
+    scores: List[int]  # Score de chaque joueur
+    lines_cleared: List[int]  # Lignes effacées par chaque joueur
+    pieces_placed: List[int]  # Pièces posées par chaque joueur
+    game_over: bool  # False si la partie a été arrêtée par la limite de pièces
+    duration: float  # Durée réelle de la simulation en secondes
+
+
+def play_game(seed: int, max_pieces: int = 500, depth: int = 2, randomizer: str = 'uniform',
+              weights: Optional[EvaluationWeights] = None) -> GameResult:
+    """
+    Joue une partie déterministe : même graine, même partie. weights remplace
+    les poids d'évaluation par défaut des deux IA
+    """
+    start = time.perf_counter()
+    clock = SimulatedClock()
+    engine = Engine(clock=clock, seed=seed, randomizer=randomizer)
+    players = engine.players
+    # Sans limite de temps : le résultat ne dépend pas de la vitesse de la machine
+    ais = [TetrisAI(depth=depth, time_budget=math.inf, weights=weights) for _ in players]
+
+    # Chaque joueur pose une pièce à tour de rôle ; une pièce dure un intervalle de chute
+    while engine.game.state == GameState.RUNNING and max(player.pieces_placed for player in players) < max_pieces:
+        for player, ai in zip(players, ais):
+            engine.play_ai_move(player, ai)
+            if engine.game.state != GameState.RUNNING:
+                break
+        clock.advance(engine.fall_speed)
+        engine.tick()
+
+    return GameResult(
+        seed=seed,
+        scores=[player.score for player in players],
+        lines_cleared=[player.lines_cleared for player in players],
+        pieces_placed=[player.pieces_placed for player in players],
+        game_over=engine.game.state == GameState.GAME_OVER,
+        duration=time.perf_counter() - start
+    )
+
+
+def run_games(games: int, seed: int = 0, workers: Optional[int] = None, max_pieces: int = 500,
+              depth: int = 2, randomizer: str = 'uniform',
+              weights: Optional[EvaluationWeights] = None) -> Iterator[GameResult]:
+    """
+    Répartit les parties sur un pool de processus et renvoie les résultats
+    au fur et à mesure qu'ils arrivent (la partie i utilise la graine seed + i)
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_game, seed + index, max_pieces, depth, randomizer, weights)
+                   for index in range(games)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def summarize(results: List[GameResult], elapsed: float) -> str:
+    """Construit un résumé lisible des résultats"""
+    if not results:
+        return "Aucune partie jouée"
+
+    scores = [score for result in results for score in result.scores]
+    lines = [count for result in results for count in result.lines_cleared]
+    pieces = [count for result in results for count in result.pieces_placed]
+    return "\n".join([
+        f"Parties : {len(results)} en {elapsed:.1f}s ({len(results) * 60 / elapsed:.0f} parties/min)",
+        f"Score moyen : {sum(scores) / len(scores):.1f} (min {min(scores)}, max {max(scores)})",
+        f"Lignes moyennes : {sum(lines) / len(lines):.1f}",
+        f"Pièces moyennes : {sum(pieces) / len(pieces):.1f}",
+        f"Parties terminées par un Game Over : {sum(result.game_over for result in results)}",
+    ])
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Parties Tetris IA contre IA sans interface")
+    parser.add_argument('--games', type=int, default=100, help="nombre de parties")
+    parser.add_argument('--seed', type=int, default=0, help="graine de la première partie")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument('--max-pieces', type=int, default=500, help="pièces maximum par joueur")
+    parser.add_argument('--depth', type=int, default=2, help="profondeur d'anticipation de l'IA")
+    parser.add_argument('--randomizer', choices=list(RANDOMIZERS), default='uniform',
+                        help="générateur des pièces")
+    parser.add_argument('--weights', help="fichier JSON des poids d'évaluation de l'IA (voir tuner.py)")
+    parser.add_argument('--output', help="fichier JSON Lines recevant chaque résultat")
+    args = parser.parse_args()
+    weights = EvaluationWeights.load(args.weights) if args.weights else None
+
+    output = open(args.output, 'w') if args.output else None
+    results = []
+    start = time.perf_counter()
+    try:
+        for result in run_games(args.games, args.seed, args.workers, args.max_pieces, args.depth,
+                                args.randomizer, weights):
+            results.append(result)
+            if output:
+                output.write(json.dumps(asdict(result)) + "\n")
+            print(f"[{len(results)}/{args.games}] graine {result.seed} : "
+                  f"scores {result.scores}, lignes {result.lines_cleared}", file=sys.stderr)
+    finally:
+        if output:
+            output.close()
+
+    print(summarize(results, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Optimisation des poids d'évaluation de l'IA par la méthode de l'entropie croisée.
+
+Chaque génération tire une population de jeux de poids autour d'une moyenne, les
+évalue par des parties IA contre IA sans interface réparties sur tous les cœurs,
+puis recentre la distribution sur les meilleurs. L'état est sauvegardé après chaque
+génération : une optimisation interrompue reprend là où elle s'était arrêtée.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+
+from ai import EvaluationWeights
+from randomizer import RANDOMIZERS
+from selfplay import play_game
+
+
+@dataclass
+class TunerState:
+    """État de l'optimisation, sauvegardé après chaque génération"""
+    generation: int  # Nombre de générations terminées
+    mean: List[float]  # Moyenne de la distribution des poids
+    std: List[float]  # Écart type de chaque poids
+    best_weights: Optional[List[float]] = None  # Meilleur jeu de poids rencontré
+    best_fitness: float = float('-inf')
+    history: List[dict] = field(default_factory=list)  # Résumé de chaque génération
+    rng_state: Optional[list] = None  # État du générateur aléatoire
+
+    @classmethod
+    def initial(cls, weights: EvaluationWeights, spread: float) -> 'TunerState':
+        """Distribution centrée sur des poids de départ, d'écart type proportionnel à leur valeur"""
+        mean = weights.to_vector()
+        return cls(generation=0, mean=mean, std=[max(abs(value) * spread, spread) for value in mean])
+
+    @classmethod
+    def load(cls, path: str) -> 'TunerState':
+        """Lit un état sauvegardé"""
+        with open(path) as source:
+            return cls(**json.load(source))
+
+    def save(self, path: str) -> None:
+        """Écrit l'état dans un fichier temporaire puis le renomme : une interruption ne le corrompt pas"""
+        temporary = path + '.tmp'
+        with open(temporary, 'w') as output:
+            json.dump(asdict(self), output, indent=2)
+        os.replace(temporary, path)
+
+
+def sample_population(rng: random.Random, state: TunerState, size: int) -> List[List[float]]:
+    """Tire size jeux de poids selon la distribution actuelle ; la moyenne en fait toujours partie"""
+    population = [list(state.mean)]
+    while len(population) < size:
+        population.append([rng.gauss(mean, std) for mean, std in zip(state.mean, state.std)])
+    return population
+
+
+def evaluate_population(executor: ProcessPoolExecutor, population: List[List[float]], seeds: List[int],
+                        max_pieces: int, depth: int, randomizer: str) -> List[float]:
+    """
+    Fitness de chaque jeu de poids : lignes effacées en moyenne par joueur sur les mêmes
+    parties (mêmes graines) pour tous, afin de comparer les candidats à pièces égales
+    """
+    futures = {}
+    for index, vector in enumerate(population):
+        weights = EvaluationWeights.from_vector(vector)
+        for seed in seeds:
+            futures[executor.submit(play_game, seed, max_pieces, depth, randomizer, weights)] = index
+
+    lines = [0] * len(population)
+    players = [0] * len(population)
+    for future in as_completed(futures):
+        result = future.result()
+        index = futures[future]
+        lines[index] += sum(result.lines_cleared)
+        players[index] += len(result.lines_cleared)
+    return [total / count for total, count in zip(lines, players)]
+
+
+def update_state(state: TunerState, population: List[List[float]], fitness: List[float],
+                 elite_fraction: float, min_std: float) -> None:
+    """Recentre la distribution sur les meilleurs candidats de la génération"""
+    ranked = sorted(range(len(population)), key=lambda index: fitness[index], reverse=True)
+    elite = [population[index] for index in ranked[:max(2, int(len(population) * elite_fraction))]]
+
+    # Un écart type minimum évite que la recherche ne se fige trop tôt
+    columns = list(zip(*elite))
+    state.mean = [statistics.mean(column) for column in columns]
+    state.std = [max(statistics.pstdev(column), min_std) for column in columns]
+
+    best = ranked[0]
+    if fitness[best] > state.best_fitness:
+        state.best_fitness = fitness[best]
+        state.best_weights = population[best]
+    state.history.append({
+        'generation': state.generation,
+        'best': fitness[best],
+        'mean': statistics.mean(fitness),
+        'mean_candidate': fitness[0],
+    })
+    state.generation += 1
+
+
+def tune(state: TunerState, generations: int, population_size: int, games: int, seed: int,
+         max_pieces: int, depth: int, randomizer: str, elite_fraction: float, min_std: float,
+         checkpoint: str, output: Optional[str], workers: Optional[int] = None) -> TunerState:
+    """Fait avancer l'optimisation jusqu'à generations générations, avec une sauvegarde après chacune"""
+    rng = random.Random(seed)
+    if state.rng_state is not None:
+        version, internal, gauss_next = state.rng_state
+        rng.setstate((version, tuple(internal), gauss_next))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while state.generation < generations:
+            start = time.perf_counter()
+
+            # Nouvelles graines à chaque génération, pour ne pas sur-apprendre quelques parties
+            seeds = [seed + state.generation * games + index for index in range(games)]
+            population = sample_population(rng, state, population_size)
+            fitness = evaluate_population(executor, population, seeds, max_pieces, depth, randomizer)
+            update_state(state, population, fitness, elite_fraction, min_std)
+
+            state.rng_state = list(rng.getstate())
+            state.save(checkpoint)
+            if output:
+                EvaluationWeights.from_vector(state.best_weights).save(output)
+
+            summary = state.history[-1]
+            print(f"Génération {state.generation}/{generations} en {time.perf_counter() - start:.1f}s : "
+                  f"meilleur {summary['best']:.1f} lignes, moyenne {summary['mean']:.1f}, "
+                  f"meilleur global {state.best_fitness:.1f}", file=sys.stderr)
+    return state
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Optimisation des poids d'évaluation de l'IA par auto-jeu")
+    parser.add_argument('--generations', type=int, default=20, help="nombre total de générations")
+    parser.add_argument('--population', type=int, default=16, help="jeux de poids par génération")
+    parser.add_argument('--games', type=int, default=4, help="parties jouées par jeu de poids")
+    parser.add_argument('--seed', type=int, default=0, help="graine des tirages et des parties")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="nombre de processus")
+    parser.add_argument('--max-pieces', type=int, default=300, help="pièces maximum par joueur")
+    parser.add_argument('--depth', type=int, default=1, help="profondeur d'anticipation de l'IA")
+    parser.add_argument('--randomizer', choices=list(RANDOMIZERS), default='uniform',
+                        help="générateur des pièces")
+    parser.add_argument('--elite', type=float, default=0.25, help="part des meilleurs gardés à chaque génération")
+    parser.add_argument('--spread', type=float, default=0.5, help="écart type initial, relatif à chaque poids")
+    parser.add_argument('--min-std', type=float, default=0.02, help="écart type minimum de chaque poids")
+    parser.add_argument('--start', help="fichier JSON des poids de départ (par défaut, ceux de l'IA)")
+    parser.add_argument('--checkpoint', default='tuner_state.json', help="fichier de sauvegarde de l'état")
+    parser.add_argument('--resume', action='store_true', help="reprendre depuis le fichier de sauvegarde")
+    parser.add_argument('--output', default='weights.json', help="fichier JSON recevant les meilleurs poids")
+    args = parser.parse_args()
+
+    if args.resume:
+        state = TunerState.load(args.checkpoint)
+        print(f"Reprise après {state.generation} générations", file=sys.stderr)
+    else:
+        start = EvaluationWeights.load(args.start) if args.start else EvaluationWeights()
+        state = TunerState.initial(start, args.spread)
+
+    state = tune(
+        state, args.generations, args.population, args.games, args.seed, args.max_pieces, args.depth,
+        args.randomizer, args.elite, args.min_std, args.checkpoint, args.output, args.workers
+    )
+    if state.best_weights is not None:
+        best = EvaluationWeights.from_vector(state.best_weights)
+        print(f"Meilleurs poids ({state.best_fitness:.1f} lignes par partie) :")
+        print(json.dumps(asdict(best), indent=2))
+
+
+if __name__ == "__main__":
+    main()